@@ -1,20 +1,220 @@
 import sys
-import csv
-import json
 import os
+import math
+import time
+import hashlib
+import itertools
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.collections import LineCollection
+from matplotlib.patches import Rectangle
+from matplotlib.offsetbox import AnnotationBbox, OffsetImage
+from scipy.spatial import cKDTree
 from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtWidgets import (
     QFileDialog, QMessageBox, QInputDialog, QDialog, QFormLayout,
-    QLineEdit, QComboBox, QTextEdit, QPushButton, QHBoxLayout,
-    QDialogButtonBox, QMainWindow, QToolBar, QLabel, QVBoxLayout
+    QLineEdit, QComboBox, QTextEdit, QPlainTextEdit, QPushButton, QHBoxLayout,
+    QDialogButtonBox, QMainWindow, QToolBar, QLabel, QVBoxLayout, QProgressBar,
+    QSpinBox, QDockWidget, QTableWidget, QTableWidgetItem, QHeaderView, QWidget,
+    QListWidget, QListWidgetItem, QCheckBox, QDoubleSpinBox
 )
 from PyQt5.QtCore import Qt
+from cxs_core import (
+    VersionedGraph, GraphSnapshot, AnalyticsCache, SearchIndex, GraphStore, Supernode, Job, JobCancelled,
+    GraphBatch, EditHistory, parse_bulk_text, FilterIndex,
+    LAYOUTS, FORCE_LAYOUTS, incremental_layout, working_set_evictions,
+    compute_layout, multilevel_layout, compute_clustering, compute_pagerank, compute_betweenness,
+    compute_closeness, compute_overview, compute_community_layout,
+    read_csv_graph, write_csv_graph, read_json_graph, write_json_graph,
+    read_project, write_project, write_store, profiler, profiled, graph_size,
+    attribute_codes, type_colors
+)
+
+
+class JobRunner(QtCore.QObject):
+    progress = QtCore.pyqtSignal(object, object)
+    failed = QtCore.pyqtSignal(object, str)
+    changed = QtCore.pyqtSignal()
+    cancelled = QtCore.pyqtSignal(object)
+    _finished = QtCore.pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None, max_workers=2):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.active = {}
+        self._finished.connect(self._deliver)
+
+    def submit(self, key, title, func, *args, on_done=None):
+        # A newer job with the same key supersedes the running one.
+        # GraphSnapshot arguments are copied in the worker, not here.
+        self.cancel(key)
+        job = Job(key, title, on_done)
+        job.progress_callback = self.progress.emit
+        self.active[key] = job
+        self.executor.submit(self._run, job, func, args)
+        self.changed.emit()
+        self.progress.emit(job, None)
+        return job
+
+    def _run(self, job, func, args):
+        try:
+            with profiler.span(job.title, "job"):
+                args = [a.take(job) if isinstance(a, GraphSnapshot) else a for a in args]
+                result = func(*args, job)
+            self._finished.emit(job, result, None)
+        except JobCancelled:
+            self._finished.emit(job, None, None)
+        except Exception as e:
+            self._finished.emit(job, None, e)
+
+    def _deliver(self, job, result, error):
+        if job.cancelled or self.active.get(job.key) is not job:
+            return
+        del self.active[job.key]
+        self.changed.emit()
+        if error is not None:
+            self.failed.emit(job, str(error))
+        elif job.on_done is not None:
+            job.on_done(result)
+
+    def cancel(self, key):
+        job = self.active.pop(key, None)
+        if job is not None:
+            job.cancel()
+            self.changed.emit()
+            self.cancelled.emit(job)
+
+    def cancel_all(self):
+        for key in list(self.active):
+            self.cancel(key)
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ThumbnailCache(QtCore.QObject):
+    # Bounded LRU of decoded image thumbnails keyed by (path, mtime, size),
+    # so an edited file is decoded again. get() answers from memory right
+    # away and never touches the file system: paths are stat'ed and decoded
+    # on a background thread (QImage, unlike QPixmap, is safe off the GUI
+    # thread), then `ready` or `failed` fires. A known path is checked again
+    # at most every `recheck` seconds. With a directory set, thumbnails are
+    # also kept there as PNG files, which saves re-reading large originals
+    # from network shares.
+    ready = QtCore.pyqtSignal(str)
+    failed = QtCore.pyqtSignal(str)
+    decoded = QtCore.pyqtSignal(object, object, object)
+
+    def __init__(self, parent=None, size=200, max_bytes=64 * 2**20, recheck=5.0):
+        super().__init__(parent)
+        self.size = size
+        self.max_bytes = max_bytes
+        self.recheck = recheck
+        self.directory = None
+        self.images = OrderedDict()
+        self.bytes = 0
+        # path -> (key, time of the last stat)
+        self.paths = {}
+        self.pending = set()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.decoded.connect(self.store)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def cached(self, path):
+        entry = self.paths.get(path)
+        return None if entry is None else self.images.get(entry[0])
+
+    def get(self, path):
+        # The cached thumbnail, or None while it is decoded (or unreadable).
+        entry = self.paths.get(path)
+        image = self.cached(path)
+        if image is not None:
+            self.images.move_to_end(entry[0])
+        stale = image is None or time.monotonic() - entry[1] > self.recheck
+        if stale and path not in self.pending:
+            self.pending.add(path)
+            self.executor.submit(self.load, path, None if image is None else entry[0], self.directory)
+        return None if image is None or image.isNull() else image
+
+    def unreadable(self, path):
+        image = self.cached(path)
+        return image is not None and image.isNull()
+
+    def disk_path(self, key, directory):
+        digest = hashlib.sha1(repr((*key, self.size)).encode()).hexdigest()
+        return os.path.join(directory, f"{digest}.png")
+
+    def load(self, path, known, directory):
+        try:
+            st = os.stat(path)
+            key = path, st.st_mtime_ns, st.st_size
+        except (OSError, ValueError):
+            key = path, None, None
+        if key == known:
+            self.decoded.emit(path, key, None)
+            return
+        image = self.decode(key, directory) if key[1] is not None else QtGui.QImage()
+        self.decoded.emit(path, key, image)
+
+    def decode(self, key, directory):
+        image = QtGui.QImage()
+        cached = self.disk_path(key, directory) if directory else None
+        if cached and os.path.exists(cached):
+            image.load(cached)
+        if image.isNull():
+            reader = QtGui.QImageReader(key[0])
+            reader.setAutoTransform(True)
+            # Formats that support it (JPEG) decode straight at reduced size.
+            full = reader.size()
+            if full.isValid() and max(full.width(), full.height()) > self.size:
+                reader.setScaledSize(full.scaled(self.size, self.size, Qt.KeepAspectRatio))
+            image = reader.read()
+            if cached and not image.isNull():
+                image.save(cached, "PNG")
+        return image
+
+    def store(self, path, key, image):
+        self.pending.discard(path)
+        self.paths[path] = key, time.monotonic()
+        if image is None:
+            # Unchanged since the last check.
+            return
+        # Unreadable files are remembered as null images until rechecked.
+        previous = self.images.pop(key, None)
+        if previous is not None:
+            self.bytes -= previous.sizeInBytes()
+        self.images[key] = image
+        self.bytes += image.sizeInBytes()
+        while self.bytes > self.max_bytes and len(self.images) > 1:
+            _, dropped = self.images.popitem(last=False)
+            self.bytes -= dropped.sizeInBytes()
+        if image.isNull():
+            self.failed.emit(path)
+        else:
+            self.ready.emit(path)
+
+
+def image_array(image):
+    # RGBA uint8 array of a QImage, for matplotlib.
+    image = image.convertToFormat(QtGui.QImage.Format_RGBA8888)
+    width, height, stride = image.width(), image.height(), image.bytesPerLine()
+    data = np.frombuffer(image.constBits().asstring(stride * height), dtype=np.uint8)
+    return data.reshape(height, stride)[:, :width * 4].reshape(height, width, 4)
 
 
 class MplCanvas(FigureCanvas):
+    selection_changed = QtCore.pyqtSignal(object)
+    expand_requested = QtCore.pyqtSignal(object)
+    community_requested = QtCore.pyqtSignal(object)
+    collapse_requested = QtCore.pyqtSignal(object)
+
     def __init__(self, parent=None):
         self.fig, self.ax = plt.subplots(figsize=(10, 6), dpi=100)
         super().__init__(self.fig)
@@ -23,75 +223,403 @@ class MplCanvas(FigureCanvas):
         self.fig.patch.set_facecolor("#1e1e1e")
         self.ax.set_facecolor("#1e1e1e")
         self.ax.axis('off')
+        self.fig.tight_layout()
 
         self.node_positions = {}
         self.graph = None
         self.scale = 1.0
 
+        # Level of detail: every visible node is labelled once the viewport
+        # holds at most max_labels nodes, otherwise only the top nodes by
+        # the current measure are.
+        self.max_labels = 150
+        self.label_top_n = 20
+        # While zooming or panning only a strided sample of the visible
+        # nodes and edges is blitted, everything comes back afterwards.
+        self.navigation_nodes = 10000
+        self.navigation_edges = 20000
+
+        # Artists are created once and updated in place on every change.
+        # The node layer (nodes, selection, labels, thumbnails) is animated:
+        # a full draw renders the edges only and keeps them as background,
+        # so a restyle blits the node layer over it without redrawing them.
+        self.edge_collection = LineCollection([], colors="#888", alpha=0.7, zorder=1)
+        self.ax.add_collection(self.edge_collection)
+        self.node_collection = self.ax.scatter(
+            [], [], s=[], edgecolors='white', linewidths=1.5, zorder=2, animated=True
+        )
+        self.selection_collection = self.ax.scatter(
+            [], [], s=[], facecolors='none', edgecolors='#FFEB3B', linewidths=3, zorder=2.5, animated=True
+        )
+        self.label_artists = {}
+        # Optional image mode: once the viewport holds at most
+        # max_thumbnails nodes, nodes with an image show it as their marker.
+        self.thumbnails = ThumbnailCache(self)
+        self.thumbnails.ready.connect(lambda _: self.thumbnail_timer.start())
+        self.show_thumbnails = False
+        self.max_thumbnails = 40
+        self.thumbnail_px = 64
+        self.thumbnail_artists = {}
+        self.thumbnail_timer = QtCore.QTimer(self)
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(100)
+        self.thumbnail_timer.timeout.connect(self.on_thumbnails_ready)
+        self.selection_rect = Rectangle(
+            (0, 0), 0, 0, fill=False, edgecolor='#FFEB3B', linestyle='--', visible=False, zorder=4
+        )
+        self.ax.add_patch(self.selection_rect)
+
+        self.nodes = []
+        self.node_index = {}
+        self.coords = np.empty((0, 2))
+        self.edge_index = np.empty((0, 2), dtype=int)
+        self.segments = np.empty((0, 2, 2))
+        self.base_colors = np.empty((0, 3))
+        self.measure = None
+        self.measure_values = None
+        self.sizes = np.empty(0)
+        self.size_factors = np.empty(0)
+        self.colors = np.empty((0, 3))
+        self.visible = np.empty(0, dtype=int)
+        self.drawn = np.empty(0, dtype=int)
+        # View bounds and mode the culled nodes and edges were computed for.
+        self.cull_key = None
+        self.lod = 1.0
+        self.highlighted = None
+        self.highlight_mask = None
+        # Set by the window while a filter is active: returns a boolean mask
+        # over self.nodes. Hidden nodes keep their position, they are only
+        # left out of drawing and hit-testing, with the edges touching them.
+        self.node_filter = None
+        self.shown = None
+        self.edge_shown = None
+
+        # Hit-testing goes through a KD-tree over self.coords, built lazily
+        # after the positions change, with tolerances in pixels.
+        self.tree = None
+        self.hit_tolerance = 5
+        self.hovered = None
+        self.selected = set()
+        self.selection_origin = None
+        # Set by the window while a disk-backed store is open: returns how
+        # many neighbours of a node are not loaded yet.
+        self.hidden_neighbours = None
+        # Set by the window while the community overview is shown: returns
+        # the supernode a node was expanded from, if any.
+        self.community_of = None
+
+        self.navigating = False
+        self.background = None
+        self.pan_origin = None
+        self.navigation_timer = QtCore.QTimer(self)
+        self.navigation_timer.setSingleShot(True)
+        self.navigation_timer.setInterval(200)
+        self.navigation_timer.timeout.connect(self.end_navigation)
+
         self.fig.canvas.mpl_connect('scroll_event', self.zoom)
         self.fig.canvas.mpl_connect('button_press_event', self.on_click)
+        self.fig.canvas.mpl_connect('motion_notify_event', self.on_motion)
+        self.fig.canvas.mpl_connect('button_release_event', self.on_release)
+        self.fig.canvas.mpl_connect('draw_event', self.on_draw)
 
-    def update_graph(self, G, pos, measure=None):
-        self.ax.clear()
+    @profiled("affichage")
+    def update_graph(self, G, pos, measure=None, keep_view=False):
         self.graph = G
         self.node_positions = pos
 
-        self.fig.patch.set_facecolor("#1e1e1e")
-        self.ax.set_facecolor("#1e1e1e")
-        self.ax.axis('off')
-
-        type_colors = {
-            "email": "#E91E63",
-            "ip": "#3F51B5",
-            "nom": "#4CAF50",
-            "autre": "#9E9E9E"
-        }
-        base_colors = [
-            type_colors.get(G.nodes[n].get("type", "autre"), "#9E9E9E")
-            for n in G.nodes
-        ]
-
+        with profiler.span("update_graph.index", "affichage"):
+            self.nodes = list(G.nodes)
+            self.node_index = {n: i for i, n in enumerate(self.nodes)}
+            self.coords = np.array([pos[n] for n in self.nodes], dtype=float).reshape(-1, 2)
+            self.edge_index = np.array(
+                [(self.node_index[u], self.node_index[v]) for u, v in G.edges()], dtype=int
+            ).reshape(-1, 2)
+            self.segments = self.coords[self.edge_index]
+            self.cull_key = None
+            self.tree = None
+            self.selected &= self.node_index.keys()
+            self.update_highlight_mask()
+            self.update_visibility()
+        with profiler.span("update_graph.couleurs", "affichage"):
+            self.base_colors = type_colors(G, self.nodes)
+            # Supernodes carry their member count; marker area grows with it.
+            members = np.fromiter(
+                (G.nodes[n].get("members", 1) for n in self.nodes), dtype=float, count=len(self.nodes)
+            )
+            self.size_factors = 1 + 4 * np.sqrt((members - 1) / max(members.max(initial=1) - 1, 1))
+
+        if not keep_view:
+            self.reset_view()
+        self.apply_measure(measure)
+        self.refresh()
+
+    def reset_view(self):
+        self.scale = 1.0
+        if not len(self.coords):
+            return
+        (xmin, ymin), (xmax, ymax) = self.coords.min(axis=0), self.coords.max(axis=0)
+        padx = (xmax - xmin) * 0.05 or 0.1
+        pady = (ymax - ymin) * 0.05 or 0.1
+        self.ax.set_xlim(xmin - padx, xmax + padx)
+        self.ax.set_ylim(ymin - pady, ymax + pady)
+
+    @profiled("affichage", "MplCanvas.set_measure")
+    def set_measure(self, measure=None):
+        self.apply_measure(measure)
+        self.restyle()
+
+    def apply_measure(self, measure):
+        self.measure = measure
+        n = len(self.nodes)
         if measure:
-            vals = list(measure.values())
-            if vals:
-                min_val, max_val = min(vals), max(vals)
-            else:
-                min_val = max_val = 0
+            vals = np.fromiter(measure.values(), dtype=float, count=len(measure))
+            min_val, max_val = vals.min(), vals.max()
             range_val = max_val - min_val if max_val != min_val else 1
-            sizes = [
-                300 + 3000 * (measure.get(n, 0) - min_val) / range_val
-                for n in G.nodes
-            ]
-            colors = []
-            for n in G.nodes:
-                norm = (measure.get(n, 0) - min_val) / range_val
-                base_color = QtGui.QColor(base_colors[list(G.nodes).index(n)])
-                r, g, b, _ = base_color.getRgb()
-                r = int(r + (255 - r) * norm)
-                g = int(g + (255 - g) * norm)
-                b = int(b + (255 - b) * norm)
-                colors.append(f"#{r:02x}{g:02x}{b:02x}")
+            self.measure_values = np.fromiter((measure.get(v, 0) for v in self.nodes), dtype=float, count=n)
+            norm = (self.measure_values - min_val) / range_val
+            self.sizes = (300 + 3000 * norm) * self.size_factors
+            self.colors = self.base_colors + (1.0 - self.base_colors) * norm[:, None]
         else:
-            sizes = [800] * len(G.nodes)
-            colors = base_colors
-
-        nx.draw_networkx_edges(G, pos, ax=self.ax, edge_color="#888", alpha=0.7)
-        nx.draw_networkx_nodes(
-            G, pos, ax=self.ax,
-            node_color=colors,
-            node_size=sizes,
-            edgecolors='white',
-            linewidths=1.5
-        )
-        nx.draw_networkx_labels(
-            G, pos, ax=self.ax,
-            font_color='white',
-            font_size=11,
-            font_weight='bold'
+            self.measure_values = None
+            self.sizes = 800.0 * self.size_factors
+            self.colors = self.base_colors
+
+    @profiled("affichage", "MplCanvas.set_highlight")
+    def set_highlight(self, nodes=None):
+        highlighted = set(nodes) if nodes is not None else None
+        if highlighted == self.highlighted:
+            return
+        self.highlighted = highlighted
+        self.update_highlight_mask()
+        # Only the node colours and the labels depend on the highlight.
+        self.style_colors()
+        self.update_labels()
+        self.blit_nodes()
+
+    def update_highlight_mask(self):
+        if self.highlighted is None:
+            self.highlight_mask = None
+            return
+        self.highlight_mask = np.zeros(len(self.nodes), dtype=bool)
+        self.highlight_mask[[self.node_index[n] for n in self.highlighted if n in self.node_index]] = True
+
+    def set_node_filter(self, node_filter=None):
+        self.node_filter = node_filter
+        self.update_visibility()
+        self.refresh()
+
+    def update_visibility(self):
+        mask = self.node_filter(self.graph, self.nodes) if self.node_filter else None
+        self.shown = mask
+        self.cull_key = None
+        if mask is None:
+            self.edge_shown = None
+            return
+        self.edge_shown = mask[self.edge_index].all(axis=1)
+        self.selected = {n for n in self.selected if mask[self.node_index[n]]}
+
+    def refresh(self):
+        self.cull()
+        self.update_labels()
+        self.update_thumbnails()
+        self.draw_idle()
+
+    def restyle(self):
+        # Colours, sizes or selection changed but not the view:
+        # only the node layer is updated and blitted over the edges.
+        self.style_nodes()
+        self.update_labels()
+        self.update_thumbnails()
+        self.blit_nodes()
+
+    @profiled("affichage", "MplCanvas.cull")
+    def cull(self):
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        mx, my = (x1 - x0) * 0.02, (y1 - y0) * 0.02
+        x0, x1, y0, y1 = x0 - mx, x1 + mx, y0 - my, y1 + my
+        key = (x0, x1, y0, y1, self.navigating)
+        if key != self.cull_key:
+            self.cull_key = key
+            self.cull_view(x0, x1, y0, y1)
+        self.style_nodes()
+
+    def cull_view(self, x0, x1, y0, y1):
+        xs, ys = self.coords[:, 0], self.coords[:, 1]
+        inside = (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+        if self.shown is not None:
+            inside &= self.shown
+        self.visible = np.flatnonzero(inside)
+        # Crowded views get smaller, borderless markers so the overview
+        # stays readable and cheap to rasterize.
+        lod = self.lod = min(1.0, math.sqrt(self.max_labels / max(len(self.visible), 1)))
+        drawn = self.visible
+        if self.navigating and len(drawn) > self.navigation_nodes:
+            drawn = drawn[::len(drawn) // self.navigation_nodes + 1]
+        self.drawn = drawn
+        self.node_collection.set_offsets(self.coords[drawn])
+        self.node_collection.set_linewidths(1.5 * lod if lod > 0.5 else 0)
+
+        seg_x, seg_y = self.segments[:, :, 0], self.segments[:, :, 1]
+        inside = (
+            (seg_x.max(axis=1) >= x0) & (seg_x.min(axis=1) <= x1)
+            & (seg_y.max(axis=1) >= y0) & (seg_y.min(axis=1) <= y1)
         )
-        self.fig.tight_layout()
+        if self.edge_shown is not None:
+            inside &= self.edge_shown
+        edges = np.flatnonzero(inside)
+        if self.navigating and len(edges) > self.navigation_edges:
+            edges = edges[::len(edges) // self.navigation_edges + 1]
+        self.edge_collection.set_segments(self.segments[edges])
+
+    def style_nodes(self):
+        drawn, lod = self.drawn, self.lod
+        self.node_collection.set_sizes(self.sizes[drawn] * lod)
+        self.style_colors()
+
+        selected = [self.node_index[n] for n in self.selected]
+        self.selection_collection.set_offsets(self.coords[selected].reshape(-1, 2))
+        self.selection_collection.set_sizes(self.sizes[selected] * lod)
+
+    def style_colors(self):
+        drawn = self.drawn
+        if self.highlight_mask is None:
+            self.node_collection.set_facecolors(self.colors[drawn])
+            self.node_collection.set_edgecolors('white')
+        else:
+            # Search matches keep their colour, everything else is faded.
+            alpha = np.where(self.highlight_mask[drawn], 1.0, 0.15)
+            self.node_collection.set_facecolors(np.column_stack([self.colors[drawn], alpha]))
+            self.node_collection.set_edgecolors(np.column_stack([np.ones((len(drawn), 3)), alpha]))
+
+    @profiled("affichage", "MplCanvas.update_labels")
+    def update_labels(self):
+        candidates = self.visible
+        if self.highlight_mask is not None:
+            candidates = candidates[self.highlight_mask[candidates]]
+        if self.navigating:
+            wanted = []
+        elif len(candidates) <= self.max_labels:
+            wanted = candidates
+        elif self.measure_values is not None:
+            wanted = candidates[np.argsort(self.measure_values[candidates])[-self.label_top_n:]]
+        else:
+            wanted = []
+
+        wanted = {self.nodes[i]: i for i in wanted}
+        for n in list(self.label_artists):
+            if n not in wanted:
+                self.label_artists.pop(n).remove()
+        for n, i in wanted.items():
+            x, y = self.coords[i]
+            label = self.label_artists.get(n)
+            if label is None:
+                self.label_artists[n] = self.ax.text(
+                    x, y, str(n), color='white', fontsize=11, fontweight='bold',
+                    ha='center', va='center', zorder=3, clip_on=True, animated=True
+                )
+            else:
+                label.set_position((x, y))
+
+    def set_show_thumbnails(self, enabled):
+        self.show_thumbnails = enabled
+        self.refresh()
+
+    def on_thumbnails_ready(self):
+        if self.show_thumbnails and not self.navigating:
+            self.update_thumbnails()
+            self.blit_nodes()
+
+    @profiled("affichage", "MplCanvas.update_thumbnails")
+    def update_thumbnails(self):
+        wanted = {}
+        if self.show_thumbnails and not self.navigating and len(self.visible) <= self.max_thumbnails:
+            for i in self.visible:
+                path = self.graph.nodes[self.nodes[i]].get("image")
+                if path:
+                    wanted[self.nodes[i], path] = i
+
+        for key in list(self.thumbnail_artists):
+            if key not in wanted:
+                self.thumbnail_artists.pop(key).remove()
+        for key, i in wanted.items():
+            artist = self.thumbnail_artists.get(key)
+            if artist is not None:
+                artist.xy = self.coords[i]
+                continue
+            image = self.thumbnails.get(key[1])
+            if image is None:
+                continue
+            picture = OffsetImage(
+                image_array(image), zoom=self.thumbnail_px / max(image.width(), image.height())
+            )
+            artist = AnnotationBbox(
+                picture, self.coords[i], frameon=True, pad=0.1, zorder=2.2,
+                bboxprops={"edgecolor": "white", "facecolor": "#1e1e1e"}
+            )
+            artist.set_animated(True)
+            self.ax.add_artist(artist)
+            self.thumbnail_artists[key] = artist
+
+    def begin_navigation(self):
+        if self.navigating:
+            return
+        self.navigating = True
+        self.update_labels()
+        self.update_thumbnails()
+        self.edge_collection.set_animated(True)
+        # The full draw renders only the static background, which on_draw
+        # keeps for blitting the graph on every navigation step.
         self.draw()
 
+    def end_navigation(self):
+        if not self.navigating or self.pan_origin is not None:
+            return
+        self.navigating = False
+        self.background = None
+        self.edge_collection.set_animated(False)
+        self.refresh()
+
+    def node_layer(self):
+        artists = [
+            self.node_collection, self.selection_collection,
+            *self.thumbnail_artists.values(), *self.label_artists.values()
+        ]
+        return sorted(artists, key=lambda artist: artist.get_zorder())
+
+    def draw(self):
+        with profiler.span("MplCanvas.draw", "affichage", nodes=len(self.visible)):
+            super().draw()
+
+    def on_draw(self, event):
+        # A full draw leaves the animated artists out: keep what it rendered
+        # as background, then paint the node layer on top.
+        self.background = self.copy_from_bbox(self.fig.bbox)
+        if not self.navigating:
+            for artist in self.node_layer():
+                self.ax.draw_artist(artist)
+
+    @profiled("affichage", "MplCanvas.blit_nodes")
+    def blit_nodes(self):
+        if self.navigating or self.background is None:
+            self.draw_idle()
+            return
+        self.restore_region(self.background)
+        for artist in self.node_layer():
+            self.ax.draw_artist(artist)
+        self.blit(self.fig.bbox)
+
+    @profiled("affichage", "MplCanvas.blit_graph")
+    def blit_graph(self):
+        self.cull()
+        if self.background is None:
+            self.draw_idle()
+            return
+        self.restore_region(self.background)
+        for artist in [self.edge_collection, *self.node_layer()]:
+            self.ax.draw_artist(artist)
+        self.blit(self.fig.bbox)
+
     def zoom(self, event):
         base_scale = 1.2
         if event.button == 'up':
@@ -116,22 +644,132 @@ class MplCanvas(FigureCanvas):
         relx = (cur_xlim[1] - xdata) / (cur_xlim[1] - cur_xlim[0]) if (cur_xlim[1] - cur_xlim[0]) != 0 else 0.5
         rely = (cur_ylim[1] - ydata) / (cur_ylim[1] - cur_ylim[0]) if (cur_ylim[1] - cur_ylim[0]) != 0 else 0.5
 
+        self.begin_navigation()
         self.ax.set_xlim([xdata - new_width * (1 - relx), xdata + new_width * relx])
         self.ax.set_ylim([ydata - new_height * (1 - rely), ydata + new_height * rely])
-        self.draw()
+        self.blit_graph()
+        self.navigation_timer.start()
+
+    @profiled("affichage", "MplCanvas.node_at")
+    def node_at(self, x, y):
+        if not len(self.visible):
+            return None
+        if self.tree is None:
+            self.tree = cKDTree(self.coords)
+
+        # Marker radii are in points; convert to pixels and search the tree
+        # with the largest radius, then check candidates in pixel space.
+        px_radii = np.sqrt(self.sizes * self.lod) / 2 * self.fig.dpi / 72
+        max_px = max(px_radii.max(), self.hit_tolerance)
+        inverse = self.ax.transData.inverted()
+        (x0, y0), (x1, y1) = inverse.transform([(x, y), (x + max_px, y + max_px)])
+        candidates = self.tree.query_ball_point((x0, y0), max(abs(x1 - x0), abs(y1 - y0)))
+        if not candidates:
+            return None
+
+        candidates = np.asarray(candidates)
+        screen = self.ax.transData.transform(self.coords[candidates])
+        dist = np.hypot(screen[:, 0] - x, screen[:, 1] - y)
+        hits = dist <= np.maximum(px_radii[candidates], self.hit_tolerance)
+        if self.shown is not None:
+            hits &= self.shown[candidates]
+        if not hits.any():
+            return None
+        best = candidates[hits][np.argmin(dist[hits])]
+        return self.nodes[best]
+
+    def nodes_in_rect(self, x0, y0, x1, y1):
+        (x0, x1), (y0, y1) = sorted((x0, x1)), sorted((y0, y1))
+        xs, ys = self.coords[:, 0], self.coords[:, 1]
+        inside = (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+        if self.shown is not None:
+            inside &= self.shown
+        return {self.nodes[i] for i in np.flatnonzero(inside)}
+
+    def set_selection(self, nodes):
+        self.selected = set(nodes) & self.node_index.keys()
+        if self.shown is not None:
+            self.selected = {n for n in self.selected if self.shown[self.node_index[n]]}
+        self.style_nodes()
+        self.blit_nodes()
+        self.selection_changed.emit(self.selected)
 
     def on_click(self, event):
         if event.inaxes != self.ax:
             return
-        x_click, y_click = event.xdata, event.ydata
-        tolerance = 0.05
         if self.graph is None or not self.node_positions:
             return
 
-        for node, (x_node, y_node) in self.node_positions.items():
-            if abs(x_node - x_click) < tolerance and abs(y_node - y_click) < tolerance:
-                self.show_node_info(node)
-                break
+        node = self.node_at(event.x, event.y)
+        if isinstance(node, Supernode):
+            self.community_requested.emit(node)
+            return
+        if node is not None:
+            self.show_node_info(node)
+            return
+
+        if event.button == 1 and event.key == 'shift':
+            self.selection_origin = (event.xdata, event.ydata)
+            self.selection_rect.set_bounds(event.xdata, event.ydata, 0, 0)
+            self.selection_rect.set_visible(True)
+            self.selection_rect.set_animated(True)
+            self.draw()
+        elif event.button == 1:
+            self.pan_origin = (
+                event.x, event.y, self.ax.get_xlim(), self.ax.get_ylim(),
+                self.ax.transData.inverted().frozen()
+            )
+            self.begin_navigation()
+            self.blit_graph()
+
+    def on_motion(self, event):
+        if self.selection_origin is not None:
+            if event.xdata is None or event.ydata is None:
+                return
+            x0, y0 = self.selection_origin
+            self.selection_rect.set_bounds(x0, y0, event.xdata - x0, event.ydata - y0)
+            self.restore_region(self.background)
+            for artist in [*self.node_layer(), self.selection_rect]:
+                self.ax.draw_artist(artist)
+            self.blit(self.fig.bbox)
+            return
+        if self.pan_origin is None:
+            self.hover(event)
+            return
+        x, y, xlim, ylim, inverse = self.pan_origin
+        (x0, y0), (x1, y1) = inverse.transform([(x, y), (event.x, event.y)])
+        dx, dy = x1 - x0, y1 - y0
+        self.ax.set_xlim(xlim[0] - dx, xlim[1] - dx)
+        self.ax.set_ylim(ylim[0] - dy, ylim[1] - dy)
+        self.blit_graph()
+
+    def on_release(self, event):
+        if self.selection_origin is not None:
+            x, y, w, h = self.selection_rect.get_bbox().bounds
+            self.selection_origin = None
+            self.selection_rect.set_visible(False)
+            self.selection_rect.set_animated(False)
+            self.set_selection(self.nodes_in_rect(x, y, x + w, y + h))
+            return
+        if self.pan_origin is None:
+            return
+        clicked = (event.x, event.y) == self.pan_origin[:2]
+        self.pan_origin = None
+        if clicked and self.selected:
+            self.set_selection(())
+        self.end_navigation()
+
+    def hover(self, event):
+        node = self.node_at(event.x, event.y) if event.inaxes == self.ax else None
+        if node == self.hovered:
+            return
+        self.hovered = node
+        if node is None:
+            QtWidgets.QToolTip.hideText()
+            return
+        typ = self.graph.nodes[node].get("type", "")
+        text = f"{node} ({typ})" if typ else str(node)
+        QtWidgets.QToolTip.showText(QtGui.QCursor.pos(), text, self)
 
     def show_node_info(self, node):
         data = self.graph.nodes[node]
@@ -150,14 +788,43 @@ class MplCanvas(FigureCanvas):
                 layout.addRow(f"{field.capitalize()}:", lbl)
 
         img_path = data.get("image", "")
-        if img_path and os.path.isfile(img_path):
-            pixmap = QtGui.QPixmap(img_path)
-            if not pixmap.isNull():
-                pixmap = pixmap.scaledToWidth(200, QtCore.Qt.SmoothTransformation)
-                img_label = QLabel()
-                img_label.setPixmap(pixmap)
-                img_label.setAlignment(Qt.AlignCenter)
-                layout.addRow("Image:", img_label)
+        if img_path:
+            img_label = QLabel("Chargement...")
+            img_label.setAlignment(Qt.AlignCenter)
+            layout.addRow("Image:", img_label)
+
+            def show_image(path=img_path):
+                image = self.thumbnails.get(img_path) if path == img_path else None
+                if image is not None:
+                    img_label.setPixmap(QtGui.QPixmap.fromImage(image))
+                elif self.thumbnails.unreadable(img_path):
+                    show_error()
+
+            def show_error(path=img_path):
+                if path == img_path:
+                    img_label.setText("Image introuvable ou illisible")
+
+            show_image()
+            self.thumbnails.ready.connect(show_image)
+            self.thumbnails.failed.connect(show_error)
+
+            def disconnect(_):
+                self.thumbnails.ready.disconnect(show_image)
+                self.thumbnails.failed.disconnect(show_error)
+
+            dlg.finished.connect(disconnect)
+
+        hidden = self.hidden_neighbours(node) if self.hidden_neighbours else 0
+        if hidden:
+            expand_btn = QPushButton(f"Développer {hidden} voisin(s)")
+            expand_btn.clicked.connect(lambda: (dlg.accept(), self.expand_requested.emit(node)))
+            layout.addRow(expand_btn)
+
+        supernode = self.community_of(node) if self.community_of else None
+        if supernode is not None:
+            collapse_btn = QPushButton(f"Regrouper la {str(supernode).lower()}")
+            collapse_btn.clicked.connect(lambda: (dlg.accept(), self.collapse_requested.emit(supernode)))
+            layout.addRow(collapse_btn)
 
         btn_box = QDialogButtonBox(QDialogButtonBox.Close)
         btn_box.rejected.connect(dlg.reject)
@@ -233,37 +900,577 @@ class NodeDialog(QDialog):
         return data
 
 
+class BulkEditDialog(QDialog):
+    def __init__(self, types, text="", parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Coller des nœuds et des arêtes")
+        self.setModal(True)
+        self.resize(450, 400)
+
+        layout = QFormLayout(self)
+        hint = QLabel(
+            "Un élément par ligne. Des valeurs séparées par « -- », « -> », « ; » "
+            "ou une tabulation sont reliées entre elles."
+        )
+        hint.setWordWrap(True)
+        layout.addRow(hint)
+
+        self.text = QPlainTextEdit()
+        self.text.setPlainText(text)
+        layout.addRow(self.text)
+
+        self.type = QComboBox()
+        self.type.setEditable(True)
+        self.type.addItems(["", *types])
+        layout.addRow("Type des nouveaux nœuds:", self.type)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def get_data(self):
+        return self.text.toPlainText(), self.type.currentText().strip()
+
+
+class NodeListModel(QtCore.QAbstractListModel):
+    # Rows are pulled lazily from the graph's own node or adjacency view,
+    # FETCH at a time as the list scrolls, so only rows that were shown are
+    # ever materialized. Changing the filter restarts the scan.
+    FETCH = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.source = ()
+        self.pattern = ""
+        self.rows = []
+        self.pending = iter(())
+        self.exhausted = True
+
+    def set_source(self, source):
+        self.source = source
+        self.restart()
+
+    def set_filter(self, text):
+        self.pattern = text.strip().lower()
+        self.restart()
+
+    def restart(self):
+        self.beginResetModel()
+        self.rows = []
+        pattern = self.pattern
+        nodes = iter(self.source)
+        self.pending = (n for n in nodes if pattern in str(n).lower()) if pattern else nodes
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore(QtCore.QModelIndex())
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return str(self.rows[index.row()])
+        return None
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        batch = list(itertools.islice(self.pending, self.FETCH))
+        self.exhausted = len(batch) < self.FETCH
+        if batch:
+            self.beginInsertRows(QtCore.QModelIndex(), len(self.rows), len(self.rows) + len(batch) - 1)
+            self.rows += batch
+            self.endInsertRows()
+
+
+class NodePicker(QWidget):
+    node_changed = QtCore.pyqtSignal(object)
+
+    def __init__(self, label, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(QLabel(label))
+
+        self.filter = QLineEdit()
+        self.filter.setPlaceholderText("Filtrer...")
+        layout.addWidget(self.filter)
+
+        self.model = NodeListModel(self)
+        self.view = QtWidgets.QListView()
+        self.view.setUniformItemSizes(True)
+        self.view.setModel(self.model)
+        layout.addWidget(self.view)
+
+        self.filter_timer = QtCore.QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(150)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter.textChanged.connect(self.filter_timer.start)
+        self.view.selectionModel().currentChanged.connect(lambda *_: self.node_changed.emit(self.node()))
+        self.model.modelReset.connect(lambda: self.node_changed.emit(None))
+
+    def set_source(self, source):
+        self.model.set_source(source)
+        self.select_first()
+
+    def apply_filter(self):
+        self.model.set_filter(self.filter.text())
+        self.select_first()
+
+    def select_first(self):
+        if self.model.rows:
+            self.view.setCurrentIndex(self.model.index(0))
+
+    def node(self):
+        index = self.view.currentIndex()
+        return self.model.rows[index.row()] if index.isValid() else None
+
+
+class NodePickerDialog(QDialog):
+    # One picker per label, side by side. With `neighbours`, the second
+    # picker lists only the neighbours of the node picked in the first, so
+    # an edge is chosen as a node pair.
+    def __init__(self, title, G, labels, neighbours=False, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setModal(True)
+        self.resize(250 * len(labels), 400)
+
+        layout = QVBoxLayout(self)
+        row = QHBoxLayout()
+        self.pickers = [NodePicker(label) for label in labels]
+        for picker in self.pickers:
+            row.addWidget(picker)
+        layout.addLayout(row)
+
+        if neighbours:
+            second = self.pickers[1]
+            self.pickers[0].node_changed.connect(
+                lambda n: second.set_source(G.adj[n] if n is not None else ())
+            )
+            self.pickers[0].set_source(G.nodes)
+        else:
+            for picker in self.pickers:
+                picker.set_source(G.nodes)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.validate_and_accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def validate_and_accept(self):
+        if any(picker.node() is None for picker in self.pickers):
+            QMessageBox.warning(self, "Erreur", "Choisissez un nœud dans chaque liste.")
+            return
+        self.accept()
+
+    def get_nodes(self):
+        return [picker.node() for picker in self.pickers]
+
+
+class FilterDialog(QDialog):
+    def __init__(self, index, measure_name=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Filtrer les nœuds")
+        self.setModal(True)
+        self.resize(420, 480)
+        self.index = index
+        self.measure_name = measure_name
+
+        layout = QFormLayout(self)
+
+        self.mode = QComboBox()
+        self.mode.addItem("Toutes les conditions (ET)", "and")
+        self.mode.addItem("Au moins une condition (OU)", "or")
+        layout.addRow("Combinaison:", self.mode)
+
+        self.types = QListWidget()
+        for value, count in index.counts("type"):
+            item = QListWidgetItem(f"{value} ({count})")
+            item.setData(Qt.UserRole, value)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Unchecked)
+            self.types.addItem(item)
+        layout.addRow("Types:", self.types)
+
+        attribute_row = QHBoxLayout()
+        self.key = QComboBox()
+        self.key.addItems(["", *(k for k in index.keys() if k != "type")])
+        self.operator = QComboBox()
+        self.operator.addItems(["=", "contient"])
+        self.value = QLineEdit()
+        attribute_row.addWidget(self.key)
+        attribute_row.addWidget(self.operator)
+        attribute_row.addWidget(self.value)
+        layout.addRow("Attribut:", attribute_row)
+
+        degrees = index.numeric("degree")[0]
+        max_degree = int(degrees[-1]) if len(degrees) else 0
+        self.degree_check = QCheckBox("Degré entre")
+        self.degree_range = [QSpinBox(), QSpinBox()]
+        for spin, value in zip(self.degree_range, (0, max_degree)):
+            spin.setRange(0, max_degree)
+            spin.setValue(value)
+        layout.addRow(self.degree_check, self.range_row(self.degree_range))
+
+        self.measure_check = None
+        if measure_name is not None:
+            values = index.numeric(measure_name)[0]
+            values = values[~np.isnan(values)]
+            low, high = (float(values[0]), float(values[-1])) if len(values) else (0.0, 0.0)
+            self.measure_check = QCheckBox(f"{measure_name} entre")
+            self.measure_range = [QDoubleSpinBox(), QDoubleSpinBox()]
+            self.measure_limits = (low, high)
+            # Enough decimals for a hundredth of the range (PageRank values
+            # are around 1/n).
+            decimals = min(max(math.ceil(-math.log10(high - low)) + 4, 2), 15) if high > low else 6
+            for spin, value in zip(self.measure_range, (low, high)):
+                spin.setDecimals(decimals)
+                spin.setRange(low, high)
+                spin.setSingleStep((high - low) / 100 or 1)
+                spin.setValue(value)
+            layout.addRow(self.measure_check, self.range_row(self.measure_range))
+
+        self.count = QLabel()
+        layout.addRow(self.count)
+        self.count_timer = QtCore.QTimer(self)
+        self.count_timer.setSingleShot(True)
+        self.count_timer.setInterval(150)
+        self.count_timer.timeout.connect(self.update_count)
+        for signal in (
+            self.mode.currentIndexChanged, self.types.itemChanged, self.key.currentIndexChanged,
+            self.operator.currentIndexChanged, self.value.textChanged, self.degree_check.toggled,
+            *(spin.valueChanged for spin in self.degree_range)
+        ):
+            # Through a lambda: connected directly, int arguments would pick
+            # the QTimer.start(msec) overload and replace the interval.
+            signal.connect(lambda *args: self.count_timer.start())
+        if self.measure_check is not None:
+            self.measure_check.toggled.connect(lambda *args: self.count_timer.start())
+            for spin in self.measure_range:
+                spin.valueChanged.connect(lambda *args: self.count_timer.start())
+        self.update_count()
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    @staticmethod
+    def range_row(spins):
+        row = QHBoxLayout()
+        row.addWidget(spins[0])
+        row.addWidget(QLabel("et"))
+        row.addWidget(spins[1])
+        return row
+
+    def get_filter(self):
+        conditions = []
+        types = [
+            self.types.item(i).data(Qt.UserRole) for i in range(self.types.count())
+            if self.types.item(i).checkState() == Qt.Checked
+        ]
+        if types:
+            conditions.append(("attribute", "type", types))
+        key, text = self.key.currentText(), self.value.text().strip()
+        if key and text:
+            if self.operator.currentText() == "=":
+                conditions.append(("attribute", key, [text]))
+            else:
+                conditions.append(("contains", key, text))
+        if self.degree_check.isChecked():
+            conditions.append(("range", "degree", *(spin.value() for spin in self.degree_range)))
+        if self.measure_check is not None and self.measure_check.isChecked():
+            # The spin boxes round to their decimals: a bound left at the end
+            # of its range stands for the exact extreme value.
+            lo, hi = (spin.value() for spin in self.measure_range)
+            if lo <= self.measure_range[0].minimum():
+                lo = self.measure_limits[0]
+            if hi >= self.measure_range[1].maximum():
+                hi = self.measure_limits[1]
+            conditions.append(("range", self.measure_name, lo, hi))
+        return conditions, self.mode.currentData()
+
+    def update_count(self):
+        mask = self.index.evaluate(*self.get_filter())
+        shown = len(self.index.nodes) if mask is None else int(mask.sum())
+        self.count.setText(f"{shown} / {len(self.index.nodes)} nœud(s) affiché(s)")
+
+
+class CentralityDialog(QDialog):
+    def __init__(self, title, node_count, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.setModal(True)
+
+        layout = QFormLayout(self)
+
+        self.mode = QComboBox()
+        self.mode.addItems(["Exacte", "Approchée (pivots)"])
+        self.mode.setCurrentIndex(1 if node_count > 5000 else 0)
+
+        self.pivots = QSpinBox()
+        self.pivots.setRange(1, max(node_count, 1))
+        self.pivots.setValue(min(node_count, 500))
+
+        self.budget = QSpinBox()
+        self.budget.setRange(0, 3600)
+        self.budget.setSuffix(" s")
+        self.budget.setSpecialValueText("Sans limite")
+
+        self.processes = QSpinBox()
+        self.processes.setRange(1, os.cpu_count() or 1)
+        self.processes.setValue(os.cpu_count() or 1)
+
+        self.mode.currentIndexChanged.connect(lambda i: self.pivots.setEnabled(i == 1))
+        self.pivots.setEnabled(self.mode.currentIndex() == 1)
+
+        layout.addRow("Mode :", self.mode)
+        layout.addRow("Pivots :", self.pivots)
+        layout.addRow("Temps max :", self.budget)
+        layout.addRow("Processus :", self.processes)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def get_settings(self):
+        pivots = self.pivots.value() if self.mode.currentIndex() == 1 else 0
+        return pivots, self.budget.value(), self.processes.value()
+
+
+class PerformancePanel(QDockWidget):
+    COLUMNS = ["Étape", "Catégorie", "Appels", "Total (ms)", "Moyenne (ms)", "Max (ms)", "Dernier (ms)", "Nœuds"]
+
+    def __init__(self, parent=None):
+        super().__init__("Performances", parent)
+        self.stats = {}
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        export_btn = QPushButton("Exporter la trace Chrome")
+        export_btn.clicked.connect(self.export_trace)
+        clear_btn = QPushButton("Effacer")
+        clear_btn.clicked.connect(self.clear)
+        buttons.addWidget(export_btn)
+        buttons.addWidget(clear_btn)
+        layout.addLayout(buttons)
+        self.setWidget(widget)
+
+        # Events can arrive by the hundred while navigating; the table is
+        # rebuilt at most a few times per second.
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(300)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def add_event(self, event):
+        name, category, _, duration, _, args = event
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = {"category": category, "count": 0, "total": 0.0, "max": 0.0}
+        stat["count"] += 1
+        stat["total"] += duration
+        stat["max"] = max(stat["max"], duration)
+        stat["last"] = duration
+        stat["nodes"] = args.get("nodes", stat.get("nodes", ""))
+        if self.isVisible() and not self.refresh_timer.isActive():
+            self.refresh_timer.start()
+
+    def refresh(self):
+        rows = sorted(self.stats.items(), key=lambda item: item[1]["total"], reverse=True)
+        self.table.setRowCount(len(rows))
+        for row, (name, stat) in enumerate(rows):
+            values = [
+                name, stat["category"], stat["count"], f"{stat['total'] * 1000:.1f}",
+                f"{stat['total'] * 1000 / stat['count']:.2f}", f"{stat['max'] * 1000:.1f}",
+                f"{stat['last'] * 1000:.1f}", stat["nodes"]
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def clear(self):
+        profiler.clear()
+        self.stats.clear()
+        self.refresh()
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter la trace", "", "Trace Chrome (*.json)")
+        if not path:
+            return
+        try:
+            profiler.write_chrome_trace(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Erreur export trace", str(e))
+
+
 class OSINTApp(QMainWindow):
+    profile_recorded = QtCore.pyqtSignal(object)
+    # Jobs computed from the current graph, cancelled when it is replaced;
+    # writers (export, project, store) keep running on their snapshot.
+    GRAPH_JOBS = ("layout", "measure", "overview", "graph")
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("🧠OSINT Graph CXS")
         self.resize(1200, 800)
         self.setStyleSheet("background-color: #121212; color: white;")
 
-        self.G = nx.Graph()
+        self.G = VersionedGraph()
         self.pos = {}
+        self.analytics = AnalyticsCache()
+        # Every edit goes through a GraphBatch, kept here for undo/redo.
+        self.history = EditHistory()
         self.layout_func = nx.spring_layout
+        # Iteration budget chosen per force-directed layout.
+        self.layout_iterations = {}
+        self.incremental_layout = True
+
+        # Optional disk-backed store; self.G is then only its working set.
+        self.store = None
+        self.store_focus = deque(maxlen=50)
+        self.max_working_nodes = 5000
 
         self.canvas = MplCanvas(self)
+        self.canvas.selection_changed.connect(self.on_selection_changed)
+        self.canvas.expand_requested.connect(self.expand_node)
+        self.canvas.community_requested.connect(self.expand_community)
+        self.canvas.collapse_requested.connect(self.collapse_community)
+        self.canvas.community_of = self.community_of
+        self.canvas.node_filter = self.filter_mask
         self.setCentralWidget(self.canvas)
 
+        # Active node filter as (graph, conditions, mode), applied as a
+        # visibility mask, see filter_nodes. It lapses with its graph.
+        self.filter_index = FilterIndex()
+        self.filter = None
+
+        # Community overview of self.G while it is shown, see show_overview.
+        self.overview = None
+        self.overview_graph = None
+
         self.search_bar = QLineEdit()
         self.search_bar.setPlaceholderText("Recherche de nœud...")
         self.search_bar.textChanged.connect(self.dynamic_search)
+        self.search_index = SearchIndex()
+        self.search_attributes = False
+        self.search_timer = QtCore.QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.run_search)
 
         self.toolbar = QToolBar("Actions")
         self.addToolBar(Qt.TopToolBarArea, self.toolbar)
         self.toolbar.addWidget(self.search_bar)
+        search_attributes_action = QtWidgets.QAction("Attributs", self)
+        search_attributes_action.setCheckable(True)
+        search_attributes_action.setToolTip("Rechercher aussi dans le type, l'URL et la description")
+        search_attributes_action.toggled.connect(self.set_search_attributes)
+        self.toolbar.addAction(search_attributes_action)
 
         self.init_toolbar_buttons()
         self.init_menu()
+        self.update_history_actions()
 
         self.current_measure = None 
+        self.current_measure_name = None
+
+        self.jobs = JobRunner(self)
+        self.jobs.progress.connect(self.on_job_progress)
+        self.jobs.failed.connect(self.on_job_failed)
+        self.jobs.changed.connect(self.on_jobs_changed)
+        self.jobs.cancelled.connect(self.on_job_cancelled)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.cancel_button = QPushButton("Annuler")
+        self.cancel_button.clicked.connect(self.jobs.cancel_all)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.statusBar().addPermanentWidget(self.cancel_button)
+        self.on_jobs_changed()
+
+        # Profiling is off unless enabled from the menu or with CXS_PROFILE=1.
+        # Spans finish on worker threads too, so they reach the readout and
+        # the panel through a queued signal.
+        self.perf_label = QLabel()
+        self.statusBar().addPermanentWidget(self.perf_label)
+        self.perf_panel = PerformancePanel(self)
+        self.perf_panel.setVisible(False)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.perf_panel)
+        self.profile_recorded.connect(self.on_profile_recorded)
+        profiler.listener = self.profile_recorded.emit
+        self.init_profiling_menu()
+        self.set_profiling(bool(os.environ.get("CXS_PROFILE")))
+
+    def closeEvent(self, event):
+        profiler.listener = None
+        self.jobs.shutdown()
+        self.canvas.thumbnails.shutdown()
+        self.close_store()
+        super().closeEvent(event)
+
+    def on_job_progress(self, job, fraction):
+        if self.jobs.active.get(job.key) is not job:
+            return
+        if fraction is None:
+            self.progress_bar.setRange(0, 0)
+            self.statusBar().showMessage(f"{job.title}...")
+        else:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(int(fraction * 100))
+            self.statusBar().showMessage(f"{job.title}... {int(fraction * 100)}%")
+
+    def on_selection_changed(self, nodes):
+        if nodes:
+            self.statusBar().showMessage(f"{len(nodes)} nœud(s) sélectionné(s)")
+        else:
+            self.statusBar().clearMessage()
+
+    def on_job_failed(self, job, message):
+        QMessageBox.warning(self, f"Erreur : {job.title}", message)
+
+    def on_job_cancelled(self, job):
+        # Writers are keyed by (kind, path) and only replace their file once
+        # complete, so a cancelled one leaves it as it was.
+        if job.key in self.GRAPH_JOBS:
+            return
+        path = job.key[1]
+        self.statusBar().showMessage(f"{job.title} annulé : {os.path.basename(path)} n'a pas été écrit")
+
+    def cancel_graph_jobs(self):
+        for key in self.GRAPH_JOBS:
+            self.jobs.cancel(key)
+
+    def on_jobs_changed(self):
+        busy = bool(self.jobs.active)
+        self.progress_bar.setVisible(busy)
+        self.cancel_button.setVisible(busy)
+        if not busy:
+            self.statusBar().clearMessage()
 
     def init_menu(self):
         menubar = self.menuBar()
 
         file_menu = menubar.addMenu("Fichier")
+        edit_menu = menubar.addMenu("Édition")
         graph_menu = menubar.addMenu("Graphe")
 
         file_actions = {
@@ -272,6 +1479,11 @@ class OSINTApp(QMainWindow):
             "Exporter CSV": self.export_csv,
             "Charger JSON": self.load_graph_json,
             "Sauvegarder JSON": self.save_graph_json,
+            "Ouvrir projet": self.load_project,
+            "Enregistrer projet": self.save_project,
+            "Ouvrir base SQLite": self.open_store,
+            "Créer base depuis le graphe": self.create_store,
+            "Fermer base": self.close_store,
             "Quitter": self.close
         }
         for name, func in file_actions.items():
@@ -288,7 +1500,12 @@ class OSINTApp(QMainWindow):
             "Degré": self.calculate_degree,
             "Coefficient de clustering": self.calculate_clustering,
             "PageRank": self.calculate_pagerank,
-            "Filtrer par type": self.filter_by_type,
+            "Intermédiarité": self.calculate_betweenness,
+            "Proximité": self.calculate_closeness,
+            "Filtrer les nœuds": self.filter_nodes,
+            "Afficher tous les nœuds": self.show_all_nodes,
+            "Vue d'ensemble (communautés)": self.show_overview,
+            "Vue complète": self.show_full_graph,
             "Changer disposition": self.change_layout
         }
         for name, func in graph_actions.items():
@@ -296,25 +1513,141 @@ class OSINTApp(QMainWindow):
             action.triggered.connect(func)
             graph_menu.addAction(action)
 
+        self.undo_action = QtWidgets.QAction("Annuler", self)
+        self.undo_action.setShortcut(QtGui.QKeySequence.Undo)
+        self.undo_action.triggered.connect(self.undo)
+        self.redo_action = QtWidgets.QAction("Rétablir", self)
+        self.redo_action.setShortcut(QtGui.QKeySequence.Redo)
+        self.redo_action.triggered.connect(self.redo)
+        paste_action = QtWidgets.QAction("Coller nœuds/arêtes...", self)
+        paste_action.setShortcut("Ctrl+Shift+V")
+        paste_action.triggered.connect(self.paste_bulk)
+        remove_selection_action = QtWidgets.QAction("Supprimer la sélection", self)
+        remove_selection_action.setShortcut(QtGui.QKeySequence.Delete)
+        remove_selection_action.triggered.connect(self.remove_selection)
+        edit_menu.addActions([self.undo_action, self.redo_action])
+        edit_menu.addSeparator()
+        edit_menu.addActions([paste_action, remove_selection_action])
+
+        incremental_action = QtWidgets.QAction("Disposition incrémentale", self)
+        incremental_action.setCheckable(True)
+        incremental_action.setChecked(self.incremental_layout)
+        incremental_action.toggled.connect(self.set_incremental_layout)
+        graph_menu.addAction(incremental_action)
+
+        thumbnails_action = QtWidgets.QAction("Vignettes des images", self)
+        thumbnails_action.setCheckable(True)
+        thumbnails_action.setToolTip("Afficher les images des nœuds comme marqueurs en zoom rapproché")
+        thumbnails_action.toggled.connect(self.canvas.set_show_thumbnails)
+        graph_menu.addAction(thumbnails_action)
+        disk_cache_action = QtWidgets.QAction("Cache disque des vignettes", self)
+        disk_cache_action.setCheckable(True)
+        disk_cache_action.toggled.connect(self.set_thumbnail_disk_cache)
+        graph_menu.addAction(disk_cache_action)
+
     def init_toolbar_buttons(self):
         buttons = {
             "➕ Ajouter": self.add_node,
             "🔗 Relier": self.link_nodes,
             "🗑 Supprimer": self.remove_node,
+            "📋 Coller": self.paste_bulk,
             "❌ Supprimer arrête": self.remove_edge,
             "🧹 Vider liens": self.clear_edges,
             "🔢 Degré": self.calculate_degree,
             "🔄 Clustering": self.calculate_clustering,
-            "🌐 PageRank": self.calculate_pagerank
+            "🌐 PageRank": self.calculate_pagerank,
+            "🌉 Intermédiarité": self.calculate_betweenness,
+            "📏 Proximité": self.calculate_closeness
         }
         for name, func in buttons.items():
             btn = QtWidgets.QPushButton(name)
             btn.clicked.connect(func)
             self.toolbar.addWidget(btn)
 
+    def init_profiling_menu(self):
+        menu = self.menuBar().addMenu("Profilage")
+        self.profiling_action = QtWidgets.QAction("Activer le profilage", self)
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.toggled.connect(self.set_profiling)
+        menu.addAction(self.profiling_action)
+        menu.addAction(self.perf_panel.toggleViewAction())
+        export_action = QtWidgets.QAction("Exporter la trace Chrome", self)
+        export_action.triggered.connect(self.perf_panel.export_trace)
+        menu.addAction(export_action)
+        clear_action = QtWidgets.QAction("Effacer la trace", self)
+        clear_action.triggered.connect(self.perf_panel.clear)
+        menu.addAction(clear_action)
+
+    def set_profiling(self, enabled):
+        profiler.enabled = enabled
+        self.profiling_action.setChecked(enabled)
+        self.perf_label.setVisible(enabled)
+        self.perf_label.clear()
+
+    def on_profile_recorded(self, event):
+        name, category, _, duration, _, args = event
+        self.perf_panel.add_event(event)
+        # Sub-millisecond hot-path spans would make the readout flicker.
+        if duration >= 0.01:
+            nodes = f" · {args['nodes']} nœuds" if "nodes" in args else ""
+            self.perf_label.setText(f"{name} : {duration * 1000:.0f} ms{nodes}")
+
+    def set_thumbnail_disk_cache(self, enabled):
+        directory = None
+        if enabled:
+            base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.CacheLocation)
+            directory = os.path.join(base or os.path.expanduser("~/.cache/cxs-graph"), "thumbnails")
+            os.makedirs(directory, exist_ok=True)
+        self.canvas.thumbnails.directory = directory
+
+    def set_incremental_layout(self, enabled):
+        self.incremental_layout = enabled
+
+    def refresh_layout(self, touched=()):
+        # Runs inside edit slots: a layout error must not escape to Qt, which
+        # would abort the application, so it falls back to the provisional
+        # placement of the new nodes.
+        try:
+            if self.incremental_layout:
+                self.pos = incremental_layout(
+                    self.G, self.pos, touched,
+                    refine=self.layout_func in FORCE_LAYOUTS
+                )
+            else:
+                self.pos = compute_layout(
+                    self.G, self.layout_func, self.layout_iterations.get(self.layout_func),
+                    Job("layout", "Calcul de la disposition", None)
+                )
+        except Exception as e:
+            self.pos = incremental_layout(self.G, self.pos, refine=False)
+            self.statusBar().showMessage(f"Disposition non affinée : {e}")
+
+    def start_layout(self):
+        # Show a quick provisional placement while the real layout runs.
+        self.pos = incremental_layout(self.G, self.pos, refine=False)
+        self.canvas.update_graph(self.G, self.pos, measure=self.current_measure)
+        self.jobs.submit(
+            "layout", "Calcul de la disposition",
+            compute_layout, GraphSnapshot(self.G), self.layout_func,
+            self.layout_iterations.get(self.layout_func),
+            on_done=self.on_layout_done
+        )
+
+    def on_layout_done(self, pos):
+        self.pos = incremental_layout(self.G, pos, refine=False)
+        if not self.overview_shown():
+            self.canvas.update_graph(self.G, self.pos, measure=self.current_measure)
+
     def new_graph(self):
-        self.G.clear()
+        self.cancel_graph_jobs()
+        self.close_store()
+        self.clear_history()
+        self.filter = None
+        # A new graph rather than clear(): writers still running copy the
+        # old one in their worker.
+        self.G = VersionedGraph()
         self.pos.clear()
+        self.search_index.rebuild(self.G)
         self.canvas.update_graph(self.G, self.pos)
         self.current_measure = None
 
@@ -322,47 +1655,57 @@ class OSINTApp(QMainWindow):
         path, _ = QFileDialog.getOpenFileName(self, "Importer CSV", "", "CSV files (*.csv)")
         if not path:
             return
-        try:
-            with open(path, newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                self.G.clear()
-                for row in reader:
-                    src = row.get('source')
-                    tgt = row.get('target')
-                    if src and tgt:
-                        self.G.add_node(src)
-                        self.G.add_node(tgt)
-                        self.G.add_edge(src, tgt)
-            self.pos = self.layout_func(self.G)
+        merge = False
+        if self.G.number_of_nodes():
+            answer = QMessageBox.question(
+                self, "Importer CSV",
+                "Fusionner avec le graphe actuel ?\n(Non : remplacer le graphe)",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+            )
+            if answer == QMessageBox.Cancel:
+                return
+            merge = answer == QMessageBox.Yes
+        self.jobs.submit(
+            "graph", "Import CSV", read_csv_graph, path, VersionedGraph(),
+            on_done=lambda G: self.on_csv_imported(G, merge)
+        )
+
+    def on_csv_imported(self, G, merge):
+        self.jobs.cancel("layout")
+        self.jobs.cancel("measure")
+        self.close_store()
+        self.clear_history()
+        if merge:
+            # Merge into the live graph so that edits made during the
+            # import are kept.
+            self.G.add_edges_from(G.edges(data=True))
+            self.G.add_nodes_from(G.nodes(data=True))
+        else:
+            self.G = G
+        self.current_measure = None
+        self.search_index.rebuild(self.G)
+        if merge:
+            self.refresh_layout()
             self.canvas.update_graph(self.G, self.pos)
-            self.current_measure = None
-        except Exception as e:
-            QMessageBox.warning(self, "Erreur import CSV", str(e))
+        else:
+            self.pos = {}
+            self.start_layout()
 
     def export_csv(self):
-        if self.G.number_of_edges() == 0:
+        if not any(self.G.adj.values()):
             QMessageBox.warning(self, "Erreur", "Le graphe ne contient aucune arête.")
             return
         path, _ = QFileDialog.getSaveFileName(self, "Exporter CSV", "", "CSV files (*.csv)")
         if not path:
             return
-        try:
-            with open(path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["source", "target"])
-                for u, v in self.G.edges():
-                    writer.writerow([u, v])
-        except Exception as e:
-            QMessageBox.warning(self, "Erreur export CSV", str(e))
+        self.jobs.submit(("export", path), "Export CSV", write_csv_graph, GraphSnapshot(self.G), path)
 
     def save_graph_json(self):
         path, _ = QFileDialog.getSaveFileName(self, "Sauvegarder JSON", "", "JSON files (*.json)")
         if not path:
             return
         try:
-            data = nx.node_link_data(self.G)
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            write_json_graph(self.G, path)
         except Exception as e:
             QMessageBox.warning(self, "Erreur sauvegarde JSON", str(e))
 
@@ -371,152 +1714,517 @@ class OSINTApp(QMainWindow):
         if not path:
             return
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            self.G = nx.node_link_graph(data)
-            self.pos = self.layout_func(self.G)
-            self.canvas.update_graph(self.G, self.pos)
+            G = read_json_graph(path)
+            self.cancel_graph_jobs()
+            self.close_store()
+            self.clear_history()
+            self.G = G
+            self.pos = {}
             self.current_measure = None
+            self.search_index.rebuild(self.G)
+            self.start_layout()
         except Exception as e:
             QMessageBox.warning(self, "Erreur chargement JSON", str(e))
 
+    def save_project(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Enregistrer projet", "", "Projets CXS (*.cxs)")
+        if not path:
+            return
+        if not os.path.splitext(path)[1]:
+            path += ".cxs"
+        layout = next((name for name, func in LAYOUTS.items() if func is self.layout_func), None)
+        self.jobs.submit(
+            ("project", path), "Enregistrement du projet", write_project,
+            path, GraphSnapshot(self.G), dict(self.pos),
+            self.current_measure, self.current_measure_name, layout
+        )
+
+    def load_project(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Ouvrir projet", "", "Projets CXS (*.cxs)")
+        if not path:
+            return
+        self.cancel_graph_jobs()
+        self.jobs.submit("graph", "Ouverture du projet", read_project, path, on_done=self.on_project_loaded)
+
+    def on_project_loaded(self, result):
+        G, pos, measure, meta = result
+        self.close_store()
+        self.clear_history()
+        self.G = G
+        self.layout_func = LAYOUTS.get(meta.get("layout"), self.layout_func)
+        # Saved positions are used as-is; only nodes without one get seeded.
+        self.pos = incremental_layout(self.G, pos, refine=False)
+        self.current_measure = measure
+        self.current_measure_name = meta.get("measure_name")
+        self.search_index.rebuild(self.G)
+        self.canvas.update_graph(self.G, self.pos, measure=measure)
+
+    def create_store(self):
+        if not self.G.nodes:
+            QMessageBox.warning(self, "Erreur", "Le graphe est vide.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Créer base", "", "Bases SQLite (*.db)")
+        if not path:
+            return
+        if os.path.exists(path):
+            QMessageBox.warning(self, "Erreur", "Choisissez un nouveau fichier pour la base.")
+            return
+        self.jobs.submit(
+            ("store", path), "Écriture de la base", write_store, path, GraphSnapshot(self.G),
+            on_done=lambda _: QMessageBox.information(self, "Base créée", f"Base enregistrée dans {path}")
+        )
+
+    def open_store(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Ouvrir base", "", "Bases SQLite (*.db)")
+        if not path:
+            return
+        text, ok = QInputDialog.getText(
+            self, "Nœuds de départ", "Nœuds à charger (séparés par des virgules) :"
+        )
+        if not ok:
+            return
+        seeds = [t.strip() for t in text.split(",") if t.strip()]
+        try:
+            store = GraphStore(path)
+            G = store.ego_graph(seeds)
+        except Exception as e:
+            QMessageBox.warning(self, "Erreur ouverture base", str(e))
+            return
+        if not G.nodes:
+            store.close()
+            QMessageBox.warning(self, "Erreur", "Aucun des nœuds demandés n'existe dans la base.")
+            return
+
+        self.close_store()
+        self.clear_history()
+        self.cancel_graph_jobs()
+        self.store = store
+        self.store_focus.extend(n for n in seeds if n in G)
+        self.canvas.hidden_neighbours = self.hidden_neighbours
+        self.G = G
+        self.pos = {}
+        self.current_measure = None
+        self.search_index.rebuild(self.G)
+        self.start_layout()
+        self.statusBar().showMessage(f"Base : {store.node_count()} nœuds, {len(G)} chargés")
+
+    def close_store(self):
+        if self.store is None:
+            return
+        self.store.close()
+        self.store = None
+        self.store_focus.clear()
+        self.canvas.hidden_neighbours = None
+
+    def hidden_neighbours(self, node):
+        return self.store.degree(node) - self.G.degree(node)
+
+    def expand_node(self, node):
+        if self.store is None or node not in self.G:
+            return
+        new_nodes = self.store.expand(self.G, [node])
+        self.store_focus.append(node)
+        for n in new_nodes:
+            self.search_index.add(n, self.G.nodes[n])
+        evicted = working_set_evictions(
+            self.G, self.store_focus, self.max_working_nodes, keep=[node, *new_nodes]
+        )
+        if evicted:
+            # Undo deltas may refer to unloaded nodes: the history is
+            # dropped, as on any other working-set replacement.
+            self.G.remove_nodes_from(evicted)
+            self.clear_history()
+        for n in evicted:
+            self.search_index.remove(n)
+        self.refresh_layout([node])
+        self.canvas.update_graph(self.G, self.pos)
+        self.current_measure = None
+        self.statusBar().showMessage(f"{len(new_nodes)} voisin(s) chargé(s), {len(evicted)} nœud(s) déchargé(s)")
 
     def add_node(self):
         dlg = NodeDialog(self)
         if dlg.exec_() == QDialog.Accepted:
             data = dlg.get_data()
-            val = data["value"]
+            val = data.pop("value")
+            data = {k: v for k, v in data.items() if v}
             if val in self.G:
                 QMessageBox.warning(self, "Erreur", f"Le nœud '{val}' existe déjà.")
                 return
-            self.G.add_node(val, **data)
-            self.pos = self.layout_func(self.G)
-            self.canvas.update_graph(self.G, self.pos)
-            self.current_measure = None
+            batch = GraphBatch(self.G, f"Ajout de '{val}'", self.store)
+            with batch:
+                batch.add_node(val, **data)
+            self.commit_batch(batch)
 
     def link_nodes(self):
         if len(self.G.nodes) < 2:
             QMessageBox.warning(self, "Erreur", "Il faut au moins 2 nœuds pour créer une arrête.")
             return
-        nodes = list(self.G.nodes)
-        src, ok1 = QInputDialog.getItem(self, "Noeud source", "Choisir le nœud source :", nodes, 0, False)
-        if not ok1:
-            return
-        tgt, ok2 = QInputDialog.getItem(self, "Noeud cible", "Choisir le nœud cible :", nodes, 0, False)
-        if not ok2:
+        dlg = NodePickerDialog("Relier nœuds", self.G, ["Nœud source :", "Nœud cible :"], parent=self)
+        if dlg.exec_() != QDialog.Accepted:
             return
+        src, tgt = dlg.get_nodes()
         if src == tgt:
             QMessageBox.warning(self, "Erreur", "Un nœud ne peut pas être relié à lui-même.")
             return
         if self.G.has_edge(src, tgt):
             QMessageBox.information(self, "Info", "L'arête existe déjà.")
             return
-        self.G.add_edge(src, tgt)
-        self.pos = self.layout_func(self.G)
-        self.canvas.update_graph(self.G, self.pos)
-        self.current_measure = None
+        batch = GraphBatch(self.G, f"Lien {src} -- {tgt}", self.store)
+        with batch:
+            batch.add_edge(src, tgt)
+        self.commit_batch(batch)
 
     def remove_node(self):
         if not self.G.nodes:
             QMessageBox.warning(self, "Erreur", "Aucun nœud à supprimer.")
             return
-        nodes = list(self.G.nodes)
-        node, ok = QInputDialog.getItem(self, "Supprimer nœud", "Choisir un nœud :", nodes, 0, False)
-        if ok and node:
-            self.G.remove_node(node)
-            self.pos = self.layout_func(self.G)
-            self.canvas.update_graph(self.G, self.pos)
-            self.current_measure = None
+        dlg = NodePickerDialog("Supprimer nœud", self.G, ["Choisir un nœud :"], parent=self)
+        if dlg.exec_() == QDialog.Accepted:
+            node, = dlg.get_nodes()
+            batch = GraphBatch(self.G, f"Suppression de '{node}'", self.store)
+            with batch:
+                batch.remove_node(node)
+            self.commit_batch(batch)
 
     def remove_edge(self):
         if not self.G.edges:
             QMessageBox.warning(self, "Erreur", "Aucune arête à supprimer.")
             return
-        edges = [f"{u} -- {v}" for u, v in self.G.edges]
-        edge_str, ok = QInputDialog.getItem(self, "Supprimer arête", "Choisir une arête :", edges, 0, False)
-        if ok and edge_str:
-            u, v = edge_str.split(" -- ")
-            if self.G.has_edge(u, v):
-                self.G.remove_edge(u, v)
-                self.pos = self.layout_func(self.G)
-                self.canvas.update_graph(self.G, self.pos)
-                self.current_measure = None
+        dlg = NodePickerDialog(
+            "Supprimer arête", self.G, ["Extrémité :", "Voisin :"], neighbours=True, parent=self
+        )
+        if dlg.exec_() == QDialog.Accepted:
+            u, v = dlg.get_nodes()
+            batch = GraphBatch(self.G, f"Suppression de {u} -- {v}", self.store)
+            with batch:
+                batch.remove_edge(u, v)
+            self.commit_batch(batch)
 
     def clear_edges(self):
-        self.G.remove_edges_from(list(self.G.edges))
-        self.pos = self.layout_func(self.G)
+        batch = GraphBatch(self.G, "Vider liens", self.store)
+        with batch:
+            batch.remove_edges(list(self.G.edges))
+        self.commit_batch(batch)
+
+    def paste_bulk(self):
+        nodes = list(self.G)
+        codes, values = attribute_codes(self.G, "type", nodes)
+        types = sorted(values[c] for c in np.unique(codes[codes >= 0]))
+        dlg = BulkEditDialog(types, QtWidgets.QApplication.clipboard().text(), self)
+        if dlg.exec_() != QDialog.Accepted:
+            return
+        text, typ = dlg.get_data()
+        nodes, edges = parse_bulk_text(text)
+        if not nodes:
+            return
+        batch = GraphBatch(self.G, f"Collage de {len(nodes)} élément(s)", self.store)
+        with batch:
+            batch.add_nodes((n for n in nodes if n not in self.G), **({"type": typ} if typ else {}))
+            added = len(batch)
+            batch.add_edges(edges)
+        self.commit_batch(batch)
+        self.statusBar().showMessage(
+            f"{added} nœud(s) et {len(batch) - added} arête(s) ajouté(s)"
+        )
+
+    def remove_selection(self):
+        nodes = [n for n in self.canvas.selected if n in self.G]
+        if not nodes:
+            QMessageBox.information(self, "Info", "Aucun nœud sélectionné (Maj + glisser pour sélectionner).")
+            return
+        answer = QMessageBox.question(
+            self, "Supprimer la sélection", f"Supprimer {len(nodes)} nœud(s) et leurs arêtes ?"
+        )
+        if answer != QMessageBox.Yes:
+            return
+        batch = GraphBatch(self.G, f"Suppression de {len(nodes)} nœud(s)", self.store)
+        with batch:
+            batch.remove_nodes(nodes)
+        self.commit_batch(batch)
+
+    def commit_batch(self, batch):
+        if batch.ops:
+            self.history.push(batch)
+            self.apply_batch(batch)
+
+    @profiled("édition")
+    def apply_batch(self, batch):
+        # Runs once per batch, after its edits, its undo or its redo: one
+        # search index update, one relayout and one redraw whatever its size.
+        self.jobs.cancel("measure")
+        for n in batch.nodes():
+            if n in self.G:
+                self.search_index.add(n, self.G.nodes[n])
+            else:
+                self.search_index.remove(n)
+                if n in self.pos:
+                    batch.positions[n] = self.pos[n]
+        self.pos.update((n, p) for n, p in batch.positions.items() if n in self.G and n not in self.pos)
+        self.refresh_layout(batch.touched)
         self.canvas.update_graph(self.G, self.pos)
         self.current_measure = None
-
+        self.update_history_actions()
+
+    def undo(self):
+        batch = self.history.undo()
+        if batch is not None:
+            self.apply_batch(batch)
+            self.statusBar().showMessage(f"Annulé : {batch.title}")
+
+    def redo(self):
+        batch = self.history.redo()
+        if batch is not None:
+            self.apply_batch(batch)
+            self.statusBar().showMessage(f"Rétabli : {batch.title}")
+
+    def clear_history(self):
+        self.history.clear()
+        self.update_history_actions()
+
+    def update_history_actions(self):
+        undo, redo = self.history.undo_stack, self.history.redo_stack
+        self.undo_action.setEnabled(bool(undo))
+        self.undo_action.setText(f"Annuler : {undo[-1].title}" if undo else "Annuler")
+        self.redo_action.setEnabled(bool(redo))
+        self.redo_action.setText(f"Rétablir : {redo[-1].title}" if redo else "Rétablir")
+
+    # Slots of triggered/clicked: a @profiled wrapper would be handed the
+    # `checked` argument, so these time their work with a span instead.
     def calculate_degree(self):
         if not self.G.nodes:
             QMessageBox.warning(self, "Erreur", "Le graphe est vide.")
             return
-        deg = dict(self.G.degree())
-        self.current_measure = deg
-        self.canvas.update_graph(self.G, self.pos, measure=deg)
-        self.show_analysis("Degré", deg)
+        self.jobs.cancel("measure")
+        with profiler.span("Degré", "analyse", **graph_size(self.G)):
+            deg = self.analytics.degree(self.G)
+        self.show_measure_analysis("Degré", deg)
 
     def calculate_clustering(self):
         if not self.G.nodes:
             QMessageBox.warning(self, "Erreur", "Le graphe est vide.")
             return
-        clustering = nx.clustering(self.G)
-        self.current_measure = clustering
-        self.canvas.update_graph(self.G, self.pos, measure=clustering)
-        self.show_analysis("Coefficient de clustering", clustering)
+        with profiler.span("Coefficient de clustering", "analyse", **graph_size(self.G)):
+            clustering = self.analytics.clustering(self.G)
+        if clustering is not None:
+            self.jobs.cancel("measure")
+            self.show_measure_analysis("Coefficient de clustering", clustering)
+            return
+        self.submit_measure("clustering", "Coefficient de clustering", compute_clustering)
 
     def calculate_pagerank(self):
         if not self.G.nodes:
             QMessageBox.warning(self, "Erreur", "Le graphe est vide.")
             return
-        pagerank = nx.pagerank(self.G)
-        self.current_measure = pagerank
-        self.canvas.update_graph(self.G, self.pos, measure=pagerank)
-        self.show_analysis("PageRank", pagerank)
-
-    def filter_by_type(self):
-        types = set(nx.get_node_attributes(self.G, "type").values())
-        if not types:
-            QMessageBox.information(self, "Info", "Aucun type trouvé dans les nœuds.")
-            return
-        types = sorted(list(types))
-        types.insert(0, "Tous")
-        typ, ok = QInputDialog.getItem(self, "Filtrer par type", "Sélectionner un type :", types, 0, False)
-        if ok:
-            if typ == "Tous":
-                self.pos = self.layout_func(self.G)
-                self.canvas.update_graph(self.G, self.pos, measure=self.current_measure)
-            else:
-                filtered_nodes = [n for n, d in self.G.nodes(data=True) if d.get("type") == typ]
-                subg = self.G.subgraph(filtered_nodes)
-                self.pos = self.layout_func(subg)
-                self.canvas.update_graph(subg, self.pos)
+        with profiler.span("PageRank", "analyse", **graph_size(self.G)):
+            pagerank = self.analytics.get(self.G, "pagerank")
+        if pagerank is not None:
+            self.jobs.cancel("measure")
+            self.show_measure_analysis("PageRank", pagerank)
+            return
+        # Warm start from the last vector so a small edit converges quickly.
+        self.submit_measure("pagerank", "PageRank", compute_pagerank, self.analytics.pagerank_start(self.G))
+
+    def calculate_betweenness(self):
+        self.calculate_centrality("betweenness", "Intermédiarité", compute_betweenness)
+
+    def calculate_closeness(self):
+        self.calculate_centrality("closeness", "Proximité", compute_closeness)
+
+    def calculate_centrality(self, name, title, func):
+        if not self.G.nodes:
+            QMessageBox.warning(self, "Erreur", "Le graphe est vide.")
+            return
+        dlg = CentralityDialog(title, self.G.number_of_nodes(), self)
+        if dlg.exec_() != QDialog.Accepted:
+            return
+        pivots, budget, processes = dlg.get_settings()
+        if pivots >= self.G.number_of_nodes():
+            pivots = 0
+        exact = not pivots and not budget
+        if exact:
+            values = self.analytics.get(self.G, name)
+            if values is not None:
+                self.jobs.cancel("measure")
+                self.show_measure_analysis(title, values)
+                return
+        else:
+            # Sampled results are not cached under the exact measure name.
+            name, title = f"{name}~", f"{title} (approchée)"
+        self.submit_measure(name, title, func, pivots, budget, processes)
+
+    def submit_measure(self, name, title, func, *args):
+        # The CSR matrix is reused when cached for this version, otherwise
+        # built in the job and cached for the version it was taken at.
+        G = self.G
+        snapshot = GraphSnapshot(G, self.analytics.matrix)
+
+        def done(values):
+            self.analytics.put(G, name, snapshot.version, values)
+            # The graph changed while the job ran: keep the values cached
+            # for that version only.
+            if G is self.G and G.version == snapshot.version:
+                self.show_measure_analysis(title, values)
+
+        self.jobs.submit("measure", title, func, snapshot, *args, on_done=done)
+
+    def filter_nodes(self):
+        if not self.G.nodes:
+            QMessageBox.warning(self, "Erreur", "Le graphe est vide.")
+            return
+        if self.canvas.graph is not self.G:
+            self.show_full_graph()
+        self.filter_index.reset(self.G, self.canvas.nodes)
+        if self.current_measure:
+            self.filter_index.set_measure(self.current_measure_name, self.current_measure)
+        dlg = FilterDialog(self.filter_index, self.current_measure_name if self.current_measure else None, self)
+        if dlg.exec_() == QDialog.Accepted:
+            conditions, mode = dlg.get_filter()
+            self.filter = (self.G, conditions, mode) if conditions else None
+            self.apply_filter()
+
+    def show_all_nodes(self):
+        self.filter = None
+        self.apply_filter()
+
+    def apply_filter(self):
+        # Only visibility changes: positions and the view stay as they are.
+        self.canvas.set_node_filter(self.filter_mask)
+        shown = self.canvas.shown
+        if shown is not None:
+            self.statusBar().showMessage(f"{int(shown.sum())} / {len(shown)} nœud(s) affiché(s)")
+        else:
+            self.statusBar().clearMessage()
+
+    def filter_mask(self, G, nodes):
+        if self.filter is None or G is not self.G or self.filter[0] is not G:
+            return None
+        self.filter_index.reset(G, nodes)
+        return self.filter_index.evaluate(*self.filter[1:])
+
+    def show_overview(self):
+        if not self.G.nodes:
+            QMessageBox.warning(self, "Erreur", "Le graphe est vide.")
+            return
+        if self.overview is not None and self.overview.graph is self.G and self.overview.version == self.G.version:
+            self.draw_overview()
+            return
+        G = self.G
+        snapshot = GraphSnapshot(G)
+        self.jobs.submit(
+            "overview", "Détection des communautés",
+            compute_overview, snapshot, self.layout_func,
+            on_done=lambda view: self.on_overview_done(view, G, snapshot.version)
+        )
+
+    def on_overview_done(self, view, G, version):
+        if G is not self.G:
+            return
+        if G.version != version:
+            # Edited while the communities were detected: start over.
+            self.show_overview()
+            return
+        # The view was built from a copy; keep it tied to the live graph.
+        view.graph, view.version = G, version
+        self.overview = view
+        self.draw_overview()
+        self.statusBar().showMessage(f"{len(view.members)} communauté(s)")
+
+    def draw_overview(self, keep_view=False):
+        self.overview_graph, pos = self.overview.display()
+        self.canvas.update_graph(self.overview_graph, pos, keep_view=keep_view)
+
+    def overview_shown(self):
+        return self.overview is not None and self.canvas.graph is self.overview_graph
+
+    def show_full_graph(self):
+        self.jobs.cancel("overview")
+        self.overview = self.overview_graph = None
+        if len(self.pos) < len(self.G):
+            self.start_layout()
+        else:
+            self.canvas.update_graph(self.G, self.pos, measure=self.current_measure)
+
+    def community_of(self, node):
+        if not self.overview_shown() or isinstance(node, Supernode):
+            return None
+        cid = self.overview.community.get(node)
+        return self.overview.supernodes[cid] if cid is not None else None
+
+    def expand_community(self, supernode):
+        if not self.overview_shown():
+            return
+        view = self.overview
+        if view.version != self.G.version:
+            # The graph changed under the overview: rebuild it first.
+            self.show_overview()
+            return
+
+        def done(pos):
+            if self.overview is view and view.version == self.G.version:
+                view.expand(supernode.id, pos)
+                self.draw_overview(keep_view=True)
+
+        members = view.members[supernode.id]
+        self.jobs.submit(
+            "overview", f"Disposition de la {str(supernode).lower()}",
+            compute_community_layout, view, supernode.id,
+            GraphSnapshot(self.G, lambda G: G.subgraph(members).copy()), on_done=done
+        )
+
+    def collapse_community(self, supernode):
+        if self.overview_shown():
+            self.overview.collapse(supernode.id)
+            self.draw_overview(keep_view=True)
 
     def change_layout(self):
-        layouts = {
-            "Spring": nx.spring_layout,
-            "Circular": nx.circular_layout,
-            "Shell": nx.shell_layout,
-            "Spectral": nx.spectral_layout,
-            "Random": nx.random_layout
-        }
-        keys = list(layouts.keys())
+        keys = list(LAYOUTS.keys())
         choice, ok = QInputDialog.getItem(self, "Changer disposition", "Choisir une disposition :", keys, 0, False)
         if ok and choice:
-            self.layout_func = layouts[choice]
-            self.pos = self.layout_func(self.G)
-            self.canvas.update_graph(self.G, self.pos, measure=self.current_measure)
+            layout_func = LAYOUTS[choice]
+            if layout_func in FORCE_LAYOUTS:
+                default = 30 if layout_func is multilevel_layout else 50
+                iterations, ok = QInputDialog.getInt(
+                    self, "Changer disposition", "Itérations (par niveau pour Multiniveau) :",
+                    self.layout_iterations.get(layout_func, default), 1, 1000
+                )
+                if not ok:
+                    return
+                self.layout_iterations[layout_func] = iterations
+            self.layout_func = layout_func
+            self.start_layout()
 
     def dynamic_search(self, text):
-        text = text.lower()
-        matched_nodes = [n for n in self.G.nodes if text in n.lower()]
+        self.search_timer.start()
+
+    def set_search_attributes(self, enabled):
+        self.search_attributes = enabled
+        self.run_search()
+
+    def run_search(self):
+        text = self.search_bar.text().strip()
+        if not text:
+            self.canvas.set_highlight(None)
+            self.statusBar().clearMessage()
+            return
+        matched_nodes = self.search_index.search(text, attributes=self.search_attributes)
         if not matched_nodes:
-            self.canvas.update_graph(self.G, self.pos, measure=self.current_measure)
+            self.canvas.set_highlight(None)
+            self.statusBar().showMessage("Aucun résultat")
             return
-        subg = self.G.subgraph(matched_nodes)
-        pos = {n: self.pos.get(n, (0, 0)) for n in subg.nodes}
-        self.canvas.update_graph(subg, pos, measure=None)
+        self.canvas.set_highlight(matched_nodes)
+        self.statusBar().showMessage(f"{len(matched_nodes)} résultat(s)")
+
+    def show_measure(self, measure, name=None):
+        self.current_measure = measure
+        self.current_measure_name = name
+        if self.canvas.graph is self.G:
+            self.canvas.set_measure(measure)
+        else:
+            self.canvas.update_graph(self.G, self.pos, measure=measure)
+
+    def show_measure_analysis(self, title, measure):
+        self.show_measure(measure, title)
+        self.show_analysis(title, measure)
 
     def show_analysis(self, title, measure):
         dlg = QDialog(self)
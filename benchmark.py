@@ -0,0 +1,324 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+import importlib.util
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import networkx as nx
+import scipy
+from cxs_core import (
+    VersionedGraph, GraphMatrix, LAYOUTS, Job, read_csv_graph, write_csv_graph,
+    read_json_graph, write_json_graph, compute_clustering, compute_pagerank
+)
+
+# Synthetic OSINT-like graphs: a preferential attachment backbone keeps
+# every node connected, extra edges between weighted endpoints give the
+# heavy-tailed degree distribution, and node types follow a fixed mix.
+TYPE_MIX = {"email": 0.5, "nom": 0.3, "ip": 0.2}
+FIRST_NAMES = ["alice", "bruno", "chloe", "david", "emma", "farid", "julie", "lucas", "nina", "omar"]
+DOMAINS = ["gmail.com", "proton.me", "outlook.fr", "yahoo.fr", "corp.example"]
+EXPENSIVE_LAYOUTS = {"Spring", "Spectral"}
+SEARCH_QUERY = "alice"
+
+
+def node_names(types, rng):
+    names = []
+    for i, typ in enumerate(types):
+        if typ == "email":
+            names.append(f"{FIRST_NAMES[i % 10]}.{i}@{DOMAINS[rng.integers(len(DOMAINS))]}")
+        elif typ == "ip":
+            names.append(f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}")
+        else:
+            names.append(f"{FIRST_NAMES[i % 10].capitalize()} {i}")
+    return names
+
+
+def make_osint_graph(n, seed=0, extra_edges=1.0, exponent=2.5):
+    rng = np.random.default_rng(seed)
+    types = rng.choice(list(TYPE_MIX), size=n, p=list(TYPE_MIX.values())).tolist()
+    names = node_names(types, rng)
+
+    # Node i > 0 links to an earlier node, biased towards the oldest ones.
+    src = np.arange(1, n)
+    dst = np.floor(src * rng.random(n - 1) ** 2).astype(np.int64)
+    weights = rng.pareto(exponent - 1, size=n) + 1
+    m = int(n * extra_edges)
+    extra = rng.choice(n, size=(m, 2), p=weights / weights.sum())
+    edges = np.concatenate([np.column_stack([src, dst]), extra])
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    edges = np.unique(np.sort(edges, axis=1), axis=0)
+
+    G = VersionedGraph()
+    G.add_nodes_from((names[i], {"type": types[i]}) for i in range(n))
+    for i in rng.choice(n, size=n // 10, replace=False).tolist():
+        G.nodes[names[i]]["url"] = f"https://example.org/{i}"
+    for i in rng.choice(n, size=n // 20, replace=False).tolist():
+        G.nodes[names[i]]["description"] = f"Source ouverte {i}"
+    G.add_edges_from((names[u], names[v]) for u, v in edges.tolist())
+    return G
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+class Bench:
+    def __init__(self, repeat, log):
+        self.repeat = repeat
+        self.log = log
+        self.results = []
+
+    def run(self, case, size, G, func, repeat=None):
+        seconds = best_of(func, repeat or self.repeat)
+        self.results.append({
+            "case": case, "size": size, "nodes": G.number_of_nodes(),
+            "edges": G.number_of_edges(), "seconds": seconds
+        })
+        self.log(f"{size:>9} {case:<32} {seconds:10.4f} s")
+
+    def skip(self, case, size, reason):
+        self.results.append({"case": case, "size": size, "skipped": reason})
+        self.log(f"{size:>9} {case:<32} {'ignoré':>10} ({reason})")
+
+
+def bench_engine(bench, size, G, workdir, layout_limit):
+    job = Job("bench", "Benchmark", None)
+    csv_path = os.path.join(workdir, f"graph_{size}.csv")
+    json_path = os.path.join(workdir, f"graph_{size}.json")
+
+    bench.run("core.write_csv", size, G, lambda: write_csv_graph(G, csv_path, job), repeat=1)
+    bench.run("core.read_csv", size, G, lambda: read_csv_graph(csv_path, VersionedGraph(), job))
+    bench.run("core.write_json", size, G, lambda: write_json_graph(G, json_path), repeat=1)
+    bench.run("core.read_json", size, G, lambda: read_json_graph(json_path))
+    bench.run("core.graph_matrix", size, G, lambda: GraphMatrix(G))
+    matrix = GraphMatrix(G)
+    bench.run("core.degree", size, G, matrix.degree)
+    bench.run("core.clustering", size, G, lambda: compute_clustering(matrix, job))
+    bench.run("core.pagerank", size, G, lambda: compute_pagerank(matrix, None, job))
+    for name, func in LAYOUTS.items():
+        if name in EXPENSIVE_LAYOUTS and size > layout_limit:
+            bench.skip(f"core.layout.{name}", size, f"> {layout_limit} nœuds")
+        else:
+            bench.run(f"core.layout.{name}", size, G, lambda: func(G), repeat=1)
+    return csv_path, json_path
+
+
+def load_app_module():
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "CXS-graph.py")
+    spec = importlib.util.spec_from_file_location("cxs_graph", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class AppDriver:
+    # Drives OSINTApp through its real slots with the file and choice
+    # dialogs answered in advance and modal windows closed immediately.
+    def __init__(self, gui):
+        from PyQt5 import QtWidgets
+        self.gui = gui
+        self.qt = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        self.errors = []
+        self.patches = [
+            mock.patch.object(QtWidgets.QDialog, "exec_", lambda dlg: 0),
+            mock.patch.object(QtWidgets.QMessageBox, "warning", lambda *args: self.errors.append(args[-1])),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.app = gui.OSINTApp()
+        self.app.resize(1200, 800)
+        self.app.show()
+        self.qt.processEvents()
+
+    def close(self):
+        self.app.close()
+        for patch in self.patches:
+            patch.stop()
+
+    def wait(self, *keys):
+        while any(key in self.app.jobs.active for key in keys):
+            self.qt.processEvents()
+            time.sleep(0.001)
+        self.qt.processEvents()
+        if self.errors:
+            raise RuntimeError(self.errors.pop())
+
+    def open_file(self, path):
+        return mock.patch.object(self.gui.QFileDialog, "getOpenFileName", lambda *args: (path, ""))
+
+    def save_file(self, path):
+        return mock.patch.object(self.gui.QFileDialog, "getSaveFileName", lambda *args: (path, ""))
+
+    def import_csv(self, path):
+        # A cheap layout keeps the background job started by the import from
+        # competing with the next measurements once it is cancelled.
+        self.app.layout_func = LAYOUTS["Random"]
+        self.app.new_graph()
+        with self.open_file(path):
+            self.app.import_csv()
+            self.wait("graph")
+        self.app.jobs.cancel("layout")
+
+    def load_graph_json(self, path):
+        self.app.layout_func = LAYOUTS["Random"]
+        with self.open_file(path):
+            self.app.load_graph_json()
+        self.app.jobs.cancel("layout")
+
+    def save_graph_json(self, path):
+        with self.save_file(path):
+            self.app.save_graph_json()
+
+    def change_layout(self, name):
+        with mock.patch.object(self.gui.QInputDialog, "getItem", lambda *args: (name, True)), \
+                mock.patch.object(self.gui.QInputDialog, "getInt", lambda *args: (args[3], True)):
+            self.app.change_layout()
+            self.wait("layout")
+
+    def update_graph(self):
+        self.app.canvas.update_graph(self.app.G, self.app.pos, measure=self.app.current_measure)
+        self.app.canvas.draw()
+
+    def search(self, text):
+        self.app.search_bar.blockSignals(True)
+        self.app.search_bar.setText(text)
+        self.app.search_bar.blockSignals(False)
+        self.app.run_search()
+
+    def clicks(self, count=20):
+        from matplotlib.backend_bases import MouseEvent
+        canvas = self.app.canvas
+        canvas.draw()
+        indices = np.linspace(0, len(canvas.nodes) - 1, count).astype(int)
+        points = canvas.ax.transData.transform(canvas.coords[indices])
+        events = [MouseEvent("button_press_event", canvas, x, y, button=1) for x, y in points]
+        return lambda: [canvas.on_click(event) for event in events]
+
+    def analysis(self, method):
+        self.app.analytics = self.gui.AnalyticsCache()
+        getattr(self.app, method)()
+        self.wait("measure")
+
+
+def bench_gui(bench, size, G, driver, csv_path, json_path, layout_limit):
+    bench.run("app.import_csv", size, G, lambda: driver.import_csv(csv_path))
+    G = driver.app.G
+    json_out = os.path.join(os.path.dirname(json_path), f"saved_{size}.json")
+    bench.run("app.save_graph_json", size, G, lambda: driver.save_graph_json(json_out), repeat=1)
+    bench.run("app.load_graph_json", size, G, lambda: driver.load_graph_json(json_path))
+    G = driver.app.G
+    for name in LAYOUTS:
+        if name in EXPENSIVE_LAYOUTS and size > layout_limit:
+            bench.skip(f"app.change_layout.{name}", size, f"> {layout_limit} nœuds")
+        else:
+            bench.run(f"app.change_layout.{name}", size, G, lambda: driver.change_layout(name), repeat=1)
+    bench.run("app.update_graph", size, G, driver.update_graph)
+    driver.app.search_index.rebuild(G)
+    bench.run("app.dynamic_search.cold", size, G, lambda: driver.search(SEARCH_QUERY), repeat=1)
+    bench.run("app.dynamic_search", size, G, lambda: driver.search(SEARCH_QUERY[:-1]))
+    driver.search("")
+    bench.run("app.on_click.x20", size, G, driver.clicks())
+    bench.run("app.calculate_degree", size, G, lambda: driver.analysis("calculate_degree"))
+    bench.run("app.calculate_clustering", size, G, lambda: driver.analysis("calculate_clustering"))
+    bench.run("app.calculate_pagerank", size, G, lambda: driver.analysis("calculate_pagerank"))
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "networkx": nx.__version__
+    }
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r["case"], r["size"]): r.get("seconds") for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        before = baseline.get((r["case"], r["size"]))
+        if before and r.get("seconds") is not None:
+            ratio = r["seconds"] / before
+            r["baseline"] = before
+            r["ratio"] = ratio
+            if ratio > threshold:
+                regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de CXS-graph sur des graphes OSINT synthétiques.")
+    parser.add_argument(
+        "--sizes", default="1000,10000,100000",
+        help="tailles des graphes, séparées par des virgules (jusqu'à 1000000)"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="répétitions par mesure (le minimum est gardé)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--layout-limit", type=int, default=5000,
+        help="taille maximale pour les dispositions coûteuses (Spring, Spectral)"
+    )
+    parser.add_argument("--no-gui", action="store_true", help="ne mesurer que le moteur cxs_core")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="rapport JSON")
+    parser.add_argument("--compare", help="rapport JSON de référence")
+    parser.add_argument("--threshold", type=float, default=1.25, help="ratio au-delà duquel une mesure régresse")
+    args = parser.parse_args(argv)
+
+    log = lambda message: print(message, file=sys.stderr)
+    bench = Bench(args.repeat, log)
+    driver = None if args.no_gui else AppDriver(load_app_module())
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for size in (int(s) for s in args.sizes.split(",")):
+                start = time.perf_counter()
+                G = make_osint_graph(size, args.seed)
+                log(f"{size:>9} graphe : {G.number_of_nodes()} nœuds, {G.number_of_edges()} arêtes "
+                    f"({time.perf_counter() - start:.1f} s)")
+                csv_path, json_path = bench_engine(bench, size, G, workdir, args.layout_limit)
+                if driver is not None:
+                    bench_gui(bench, size, G, driver, csv_path, json_path, args.layout_limit)
+    finally:
+        if driver is not None:
+            driver.close()
+
+    report = {"environment": environment(), "results": bench.results}
+    status = 0
+    if args.compare:
+        regressions = compare(bench.results, args.compare, args.threshold)
+        report["regressions"] = [(r["case"], r["size"], r["ratio"]) for r in regressions]
+        for r in regressions:
+            log(f"Régression : {r['case']} ({r['size']}) x{r['ratio']:.2f}")
+        status = 1 if regressions else 0
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    log(f"Rapport écrit dans {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
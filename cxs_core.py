@@ -0,0 +1,2573 @@
+import sys
+import csv
+import json
+import os
+import re
+import math
+import numbers
+import random
+import itertools
+import sqlite3
+import argparse
+import functools
+import contextlib
+from array import array
+from collections import deque
+from collections.abc import MutableMapping
+import threading
+import time
+import types
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+import networkx as nx
+
+
+class Profiler:
+    # Timed spans for the performance panel and the Chrome trace export.
+    # While disabled, span() hands out one shared no-op context manager and
+    # profiled functions only pay for the `enabled` check.
+    def __init__(self, limit=100000):
+        self.enabled = False
+        self.events = deque(maxlen=limit)
+        self.threads = {}
+        self.origin = time.perf_counter()
+        self.listener = None
+
+    def span(self, name, category="", **args):
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, category, args)
+
+    def record(self, name, category, start, duration, args):
+        thread = threading.current_thread()
+        self.threads[thread.ident] = thread.name
+        event = (name, category, start - self.origin, duration, thread.ident, args)
+        self.events.append(event)
+        if self.listener is not None:
+            self.listener(event)
+
+    def clear(self):
+        self.events.clear()
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        trace = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self.threads.items()
+        ]
+        trace.extend(
+            {"name": name, "cat": category or "cxs", "ph": "X", "pid": pid, "tid": tid,
+             "ts": start * 1e6, "dur": duration * 1e6, "args": args}
+            for name, category, start, duration, tid, args in list(self.events)
+        )
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "category", "args", "start")
+
+    def __init__(self, profiler, name, category, args):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.category, self.start, time.perf_counter() - self.start, self.args)
+
+
+_NO_SPAN = contextlib.nullcontext()
+profiler = Profiler()
+
+
+def graph_size(*values):
+    # Edge counts of nx graphs are left out: they cost a pass over the nodes.
+    for value in values:
+        if isinstance(value, nx.Graph):
+            return {"nodes": value.number_of_nodes()}
+        if isinstance(value, GraphMatrix):
+            return {"nodes": len(value.nodes), "edges": value.structure.nnz // 2}
+    return {}
+
+
+def profiled(category, name=None):
+    # Records a span per call, with the size of the first graph found in the
+    # arguments or the result once the call returns. Calls that raise are
+    # recorded too. Not for Qt slots: the wrapper would receive every
+    # argument the signal carries.
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                duration = time.perf_counter() - start
+                sizes = graph_size(*args, *(result if isinstance(result, tuple) else (result,)))
+                profiler.record(label, category, start, duration, sizes)
+        return wrapper
+    return decorate
+
+
+_MISSING = object()
+
+
+class ArchiveColumn:
+    # A node attribute column as loaded from a .cxs project: int32 codes per
+    # row into the archived table of distinct values, kept as one string.
+    # A value is only decoded the first time it is read; writes go to the
+    # node table and clear the row here.
+    def __init__(self, codes, text, offsets, encoding):
+        self.codes = codes
+        self.text = text
+        self.offsets = offsets
+        self.encoding = encoding
+        self.decoded = {}
+
+    def copy(self):
+        column = ArchiveColumn(self.codes.copy(), self.text, self.offsets, self.encoding)
+        column.decoded = self.decoded
+        return column
+
+    def code(self, row):
+        return int(self.codes[row]) if row < len(self.codes) else -1
+
+    def clear(self, row):
+        if row < len(self.codes):
+            self.codes[row] = -1
+
+    def value(self, code):
+        value = self.decoded.get(code, _MISSING)
+        if value is _MISSING:
+            value = self.text[self.offsets[code]:self.offsets[code + 1]]
+            if self.encoding == "json":
+                value = json.loads(value)
+            self.decoded[code] = value
+        return value
+
+    def values(self):
+        return [self.value(code) for code in range(len(self.offsets) - 1)]
+
+
+class NodeTable:
+    # Columnar node attributes shared by all nodes of a graph. Categorical
+    # fields are int32 codes into one list of distinct values, so repeated
+    # strings are stored once; any other field lives in a {row: value} side
+    # table holding only the rows where it is set. Fields loaded from a
+    # project stay ArchiveColumns until their values are read or replaced.
+    # Rows of removed nodes are recycled. `revision` counts value changes,
+    # for derived indexes.
+    CATEGORICAL = ("type",)
+
+    def __init__(self):
+        self.revision = 0
+        self.rows = 0
+        self.free = []
+        self.codes = {key: array("i") for key in self.CATEGORICAL}
+        self.categories = {key: ([], {}) for key in self.CATEGORICAL}
+        self.sparse = {}
+        self.archived = {}
+
+    def copy(self):
+        table = NodeTable()
+        table.rows = self.rows
+        table.free = list(self.free)
+        table.codes = {key: array("i", column) for key, column in self.codes.items()}
+        table.categories = {key: (list(values), dict(index)) for key, (values, index) in self.categories.items()}
+        table.sparse = {key: dict(side) for key, side in self.sparse.items()}
+        table.archived = {key: column.copy() for key, column in self.archived.items()}
+        return table
+
+    def allocate(self):
+        if self.free:
+            return self.free.pop()
+        row = self.rows
+        self.rows += 1
+        for column in self.codes.values():
+            column.append(-1)
+        return row
+
+    def release(self, row):
+        self.revision += 1
+        for column in self.codes.values():
+            column[row] = -1
+        for side in self.sparse.values():
+            side.pop(row, None)
+        for column in self.archived.values():
+            column.clear(row)
+        self.free.append(row)
+
+    def get(self, row, key, default=None):
+        column = self.codes.get(key)
+        if column is not None and column[row] >= 0:
+            return self.categories[key][0][column[row]]
+        archived = self.archived.get(key)
+        if archived is not None:
+            code = archived.code(row)
+            if code >= 0:
+                return archived.value(code)
+        side = self.sparse.get(key)
+        return default if side is None else side.get(row, default)
+
+    def set(self, row, key, value):
+        self.revision += 1
+        archived = self.archived.get(key)
+        if archived is not None:
+            archived.clear(row)
+        column = self.codes.get(key)
+        if column is not None:
+            side = self.sparse.get(key)
+            if isinstance(value, str):
+                values, index = self.categories[key]
+                code = index.get(value)
+                if code is None:
+                    code = index[value] = len(values)
+                    values.append(value)
+                column[row] = code
+                if side is not None:
+                    side.pop(row, None)
+                return
+            # Non-string values of a categorical field fall back to a side table.
+            column[row] = -1
+        self.sparse.setdefault(key, {})[row] = value
+
+    def delete(self, row, key):
+        self.revision += 1
+        found = False
+        column = self.codes.get(key)
+        if column is not None and column[row] >= 0:
+            column[row] = -1
+            found = True
+        archived = self.archived.get(key)
+        if archived is not None and archived.code(row) >= 0:
+            archived.clear(row)
+            found = True
+        side = self.sparse.get(key)
+        if side is not None and side.pop(row, _MISSING) is not _MISSING:
+            found = True
+        if not found:
+            raise KeyError(key)
+
+    def keys(self, row):
+        keys = [key for key, column in self.codes.items() if column[row] >= 0]
+        keys.extend(key for key, column in self.archived.items() if column.code(row) >= 0)
+        keys.extend(key for key, side in self.sparse.items() if row in side)
+        return keys
+
+
+class NodeAttributes(MutableMapping):
+    # The attribute mapping nx sees for one node: a view on its table row.
+    __slots__ = ("table", "row")
+
+    def __init__(self, table, row=None):
+        self.table = table
+        self.row = table.allocate() if row is None else row
+
+    def __getitem__(self, key):
+        value = self.table.get(self.row, key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        return self.table.get(self.row, key, default)
+
+    def __contains__(self, key):
+        return self.table.get(self.row, key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key, value):
+        self.table.set(self.row, key, value)
+
+    def __delitem__(self, key):
+        self.table.delete(self.row, key)
+
+    def __iter__(self):
+        return iter(self.table.keys(self.row))
+
+    def __len__(self):
+        return len(self.table.keys(self.row))
+
+    def update(self, other=(), **attr):
+        table, row = self.table, self.row
+        for key, value in (other.items() if hasattr(other, "items") else other):
+            table.set(row, key, value)
+        for key, value in attr.items():
+            table.set(row, key, value)
+
+    def copy(self):
+        table, row = self.table, self.row
+        return {key: table.get(row, key) for key in table.keys(row)}
+
+    def __repr__(self):
+        return repr(self.copy())
+
+
+def attribute_codes(G, key, nodes):
+    # Categorical codes of `key` for `nodes` (-1 where unset) and the value
+    # list they index. Read from the node table when the attributes live in
+    # one (only the rows set in a sparse field are visited, archived codes
+    # are remapped in bulk), built from the attribute mappings otherwise.
+    # Unhashable values are coded by repr.
+    values, index = [], {}
+
+    def code_of(value):
+        if value is None:
+            return -1
+        try:
+            code = index.get(value)
+        except TypeError:
+            value = repr(value)
+            code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    attrs = [G._node[n] for n in nodes]
+    codes = np.full(len(attrs), -1, dtype=np.int32)
+    if attrs and isinstance(attrs[0], NodeAttributes):
+        table = attrs[0].table
+        rows = np.fromiter((a.row for a in attrs), dtype=np.int64, count=len(attrs))
+        if key in table.codes:
+            codes = np.frombuffer(table.codes[key], dtype=np.int32)[rows]
+            return codes, table.categories[key][0]
+        archived = table.archived.get(key)
+        if archived is not None:
+            remap = np.array([code_of(v) for v in archived.values()] + [-1], dtype=np.int32)
+            inside = rows < len(archived.codes)
+            codes[inside] = remap[archived.codes[rows[inside]]]
+        position = np.full(table.rows, -1, dtype=np.int64)
+        position[rows] = np.arange(len(rows))
+        items = ((position[row], value) for row, value in table.sparse.get(key, {}).items())
+    else:
+        items = ((i, a.get(key)) for i, a in enumerate(attrs))
+    for i, value in items:
+        if i >= 0:
+            code = code_of(value)
+            if code >= 0:
+                codes[i] = code
+    return codes, values
+
+
+def _hex_rgb(color):
+    return tuple(int(color[i:i + 2], 16) / 255 for i in (1, 3, 5))
+
+
+def type_colors(G, nodes):
+    # RGB rows for the nodes' types; nodes without a type get the "autre" colour.
+    codes, types = attribute_codes(G, "type", nodes)
+    palette = [TYPE_COLORS.get(t, DEFAULT_COLOR) for t in types] + [TYPE_COLORS.get("autre", DEFAULT_COLOR)]
+    return np.array([_hex_rgb(c) for c in palette]).reshape(-1, 3)[codes]
+
+
+def _mutation(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.editing():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class VersionedGraph(nx.Graph):
+    # nx.Graph that counts its mutations and logs which nodes each one may
+    # have changed the degree or clustering of, so analytics can be cached
+    # per version and patched instead of recomputed. Bulk edits larger than
+    # LOG_LIMIT only bump the version and force a full recompute.
+    # `writing` is non-zero while a mutation is under way, so GraphSnapshot
+    # can copy the graph from another thread and detect an overlapping edit.
+    LOG_LIMIT = 20000
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.writing = 0
+        self.table = NodeTable()
+        self.version = 0
+        self.log_floor = 0
+        self.changes = deque()
+        self.logged = 0
+        super().__init__(incoming_graph_data, **attr)
+
+    def node_attr_dict_factory(self):
+        return NodeAttributes(self.table)
+
+    def copy(self, as_view=False):
+        # Subgraph views share their parent's rows, so they take the generic
+        # path; a plain graph copies its columns in bulk.
+        if as_view or hasattr(self, "_graph"):
+            return super().copy(as_view=as_view)
+        G = self.__class__()
+        G.graph.update(self.graph)
+        G.table = self.table.copy()
+        for n, d in self._node.items():
+            G._node[n] = NodeAttributes(G.table, d.row)
+            G._adj[n] = {}
+        G.add_edges_from(
+            (u, v, datadict.copy())
+            for u, nbrs in self._adj.items()
+            for v, datadict in nbrs.items()
+        )
+        return G
+
+    @contextlib.contextmanager
+    def editing(self):
+        self.writing += 1
+        try:
+            yield
+        finally:
+            self.writing -= 1
+
+    def _touch(self, nodes=None):
+        self.version += 1
+        if nodes is None or len(nodes) > self.LOG_LIMIT:
+            self.changes.clear()
+            self.logged = 0
+            self.log_floor = self.version
+            return
+        self.changes.append((self.version, nodes))
+        self.logged += len(nodes)
+        while self.logged > self.LOG_LIMIT:
+            version, dropped = self.changes.popleft()
+            self.logged -= len(dropped)
+            self.log_floor = version
+
+    def touched_since(self, version):
+        # Nodes touched after `version`, or None when the log cannot tell.
+        if version < self.log_floor:
+            return None
+        touched = set()
+        for v, nodes in reversed(self.changes):
+            if v <= version:
+                break
+            touched.update(nodes)
+        return touched
+
+    def _edge_nodes(self, edges):
+        nodes = set()
+        adj = self._adj
+        for e in edges:
+            u, v = e[0], e[1]
+            nodes.add(u)
+            nodes.add(v)
+            if u in adj and v in adj:
+                nodes.update(adj[u].keys() & adj[v].keys())
+        return nodes
+
+    @_mutation
+    def add_node(self, node_for_adding, **attr):
+        super().add_node(node_for_adding, **attr)
+        self._touch({node_for_adding})
+
+    @_mutation
+    def add_nodes_from(self, nodes_for_adding, **attr):
+        nodes = list(nodes_for_adding)
+        super().add_nodes_from(nodes, **attr)
+        if len(nodes) > self.LOG_LIMIT:
+            self._touch()
+        else:
+            self._touch({n[0] if isinstance(n, tuple) and len(n) == 2 and isinstance(n[1], dict) else n for n in nodes})
+
+    @_mutation
+    def remove_node(self, n):
+        touched = {n, *self._adj[n]} if n in self._adj else {n}
+        attrs = self._node.get(n)
+        super().remove_node(n)
+        self.table.release(attrs.row)
+        self._touch(touched)
+
+    @_mutation
+    def remove_nodes_from(self, nodes):
+        nodes = list(nodes)
+        touched = set(nodes)
+        rows = []
+        for n in nodes:
+            if n in self._adj:
+                touched.update(self._adj[n])
+                rows.append(self._node[n].row)
+        super().remove_nodes_from(nodes)
+        for row in set(rows):
+            self.table.release(row)
+        self._touch(touched)
+
+    @_mutation
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+        self._touch(self._edge_nodes([(u_of_edge, v_of_edge)]))
+
+    @_mutation
+    def add_edges_from(self, ebunch_to_add, **attr):
+        edges = list(ebunch_to_add)
+        super().add_edges_from(edges, **attr)
+        self._touch(self._edge_nodes(edges) if len(edges) <= self.LOG_LIMIT else None)
+
+    @_mutation
+    def remove_edge(self, u, v):
+        touched = self._edge_nodes([(u, v)])
+        super().remove_edge(u, v)
+        self._touch(touched)
+
+    @_mutation
+    def remove_edges_from(self, ebunch):
+        edges = list(ebunch)
+        touched = self._edge_nodes(edges) if len(edges) <= self.LOG_LIMIT else None
+        super().remove_edges_from(edges)
+        self._touch(touched)
+
+    @_mutation
+    def clear(self):
+        super().clear()
+        self.table = NodeTable()
+        self._touch()
+
+    @_mutation
+    def clear_edges(self):
+        super().clear_edges()
+        self._touch()
+
+
+def _numeric_weights(data):
+    # Weights typed in as text in the editor count as 1, like missing ones.
+    try:
+        weights = np.array(data, dtype=float)
+    except (TypeError, ValueError):
+        weights = np.array([_numeric_weight(w) for w in data], dtype=float)
+    weights[~np.isfinite(weights)] = 1.0
+    return weights
+
+
+def _numeric_weight(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class GraphSnapshot:
+    # Stands in for a copy of a VersionedGraph among a job's arguments: the
+    # GUI thread only records the graph, and the worker makes the copy with
+    # take(), again if an edit overlapped it. `copy` builds the snapshot
+    # from the graph (G.copy() by default); `version` is the version it was
+    # taken at.
+    def __init__(self, G, copy=None):
+        self.graph = G
+        self.copy = copy or VersionedGraph.copy
+        self.version = None
+
+    def take(self, job):
+        G = self.graph
+        while True:
+            job.report()
+            version = G.version
+            if G.writing:
+                time.sleep(0.01)
+                continue
+            try:
+                snapshot = self.copy(G)
+            except RuntimeError:
+                # A dict of the graph changed size during the copy.
+                continue
+            if G.version == version and not G.writing:
+                self.version = version
+                return snapshot
+
+
+class GraphMatrix:
+    # Immutable CSR snapshot of a graph. The analyses are vectorized over it
+    # and return the same node -> value dicts as their NetworkX equivalents,
+    # so it can be handed to a worker thread instead of a graph copy.
+    @profiled("analyse", "GraphMatrix")
+    def __init__(self, G, weight="weight"):
+        self.nodes = list(G)
+        index = {n: i for i, n in enumerate(self.nodes)}
+        rows, cols, data = [], [], []
+        for u, nbrs in G.adj.items():
+            iu = index[u]
+            for v, d in nbrs.items():
+                rows.append(iu)
+                cols.append(index[v])
+                data.append(d.get(weight, 1))
+        n = len(self.nodes)
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+        self.weighted = sp.csr_array((_numeric_weights(data), (rows, cols)), shape=(n, n))
+        # Unweighted structure without self-loops, as used by nx.clustering.
+        keep = rows != cols
+        self.structure = sp.csr_array(
+            (np.ones(keep.sum(), dtype=np.int64), (rows[keep], cols[keep])), shape=(n, n)
+        )
+        self.self_loops = np.bincount(rows[~keep], minlength=n)
+
+    def to_dict(self, values):
+        return dict(zip(self.nodes, values.tolist()))
+
+    @profiled("analyse")
+    def degree(self):
+        # Self-loops count twice, as in G.degree().
+        return self.to_dict(self.structure.sum(axis=1) + 2 * self.self_loops)
+
+    @profiled("analyse")
+    def clustering(self, job=None, chunk_size=5000):
+        A = self.structure
+        n = A.shape[0]
+        triangles = np.zeros(n)
+        # Row blocks of (A @ A) * A keep the intermediate product small.
+        for start in range(0, n, chunk_size):
+            if job is not None:
+                job.report(start / max(n, 1))
+            block = A[start:start + chunk_size]
+            triangles[start:start + chunk_size] = (block @ A).multiply(block).sum(axis=1) / 2
+        deg = A.sum(axis=1).astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.where(deg > 1, 2 * triangles / (deg * (deg - 1)), 0.0)
+        return self.to_dict(values)
+
+    @profiled("analyse")
+    def pagerank(self, alpha=0.85, nstart=None, tol=1.0e-6, max_iter=100, job=None):
+        # Same power iteration as nx.pagerank: dangling nodes spread their
+        # rank uniformly and convergence is an L1 change below N * tol.
+        n = len(self.nodes)
+        if n == 0:
+            return {}
+        out = self.weighted.sum(axis=1)
+        dangling = out == 0
+        inv = np.divide(1.0, out, out=np.zeros(n), where=~dangling)
+        Q = sp.diags_array(inv) @ self.weighted
+
+        if nstart is None:
+            x = np.full(n, 1.0 / n)
+        else:
+            x = np.array([nstart.get(node, 0) for node in self.nodes], dtype=float)
+            x = x / x.sum() if x.sum() > 0 else np.full(n, 1.0 / n)
+        p = 1.0 / n
+        target = n * tol
+        first_err = None
+        for _ in range(max_iter):
+            xlast = x
+            x = alpha * (x @ Q + x[dangling].sum() * p) + (1 - alpha) * p
+            err = np.abs(x - xlast).sum()
+            if err < target:
+                return self.to_dict(x)
+            if job is not None:
+                first_err = first_err or err
+                job.report(max(0.0, min(1.0, math.log(first_err / err) / math.log(first_err / target))))
+        raise nx.PowerIterationFailedConvergence(max_iter)
+
+
+class AnalyticsCache:
+    # Results keyed by measure name and stamped with the graph version they
+    # were computed for. Entries hold a weak reference to their graph so a
+    # replaced graph is not kept alive by the cache. The CSR snapshot used
+    # by the full computations is cached the same way.
+    def __init__(self):
+        self.entries = {}
+        self.snapshot = None
+
+    def matrix(self, G):
+        # Also called from a worker through a GraphSnapshot: the version is
+        # read first, so a matrix built across an edit is already stale.
+        version = G.version
+        if self.snapshot is not None:
+            ref, cached, matrix = self.snapshot
+            if ref() is G and cached == version:
+                return matrix
+        matrix = GraphMatrix(G)
+        self.snapshot = (weakref.ref(G), version, matrix)
+        return matrix
+
+    def put(self, G, name, version, values):
+        self.entries[name] = (weakref.ref(G), version, values)
+
+    def previous(self, G, name):
+        entry = self.entries.get(name)
+        if entry is None or entry[0]() is not G:
+            return None
+        return entry[1], entry[2]
+
+    def get(self, G, name):
+        previous = self.previous(G, name)
+        if previous is not None and previous[0] == G.version:
+            return previous[1]
+        return None
+
+    def _patch(self, G, name, max_touched, compute):
+        previous = self.previous(G, name)
+        if previous is None:
+            return None
+        version, values = previous
+        if version == G.version:
+            return values
+        touched = G.touched_since(version)
+        if touched is None or len(touched) > max_touched:
+            return None
+        values = dict(values)
+        for n in touched:
+            values.pop(n, None)
+        values.update(compute([n for n in touched if n in G]))
+        self.put(G, name, G.version, values)
+        return values
+
+    def degree(self, G):
+        values = self._patch(G, "degree", math.inf, lambda nodes: G.degree(nodes))
+        if values is None:
+            values = self.matrix(G).degree()
+            self.put(G, "degree", G.version, values)
+        return values
+
+    def clustering(self, G, max_touched=5000):
+        # Only the cached or incrementally patched result; None means a full
+        # computation is needed.
+        return self._patch(G, "clustering", max_touched, lambda nodes: nx.clustering(G, nodes))
+
+    def pagerank_start(self, G):
+        previous = self.previous(G, "pagerank")
+        return previous[1] if previous is not None else None
+
+
+@profiled("layout")
+def layout_weight(G, weight="weight"):
+    # The edge attribute the NetworkX layouts and Louvain may use as a
+    # weight, or None when some edge holds a value they cannot use (a weight
+    # typed in as text).
+    for _, _, value in G.edges(data=weight):
+        if value is not None and not isinstance(value, numbers.Real):
+            return None
+    return weight
+
+
+def incremental_layout(G, pos, touched=(), iterations=15, refine=True, max_nodes=200):
+    # Keeps known positions, seeds new nodes next to their placed neighbours
+    # and relaxes only the neighbourhood of the edit, the rest stays pinned.
+    pos = {n: np.asarray(p, dtype=float) for n, p in pos.items() if n in G}
+    new_nodes = [n for n in G if n not in pos]
+
+    if pos:
+        coords = np.array(list(pos.values()))
+        lo, hi = coords.min(axis=0), coords.max(axis=0)
+    else:
+        lo, hi = np.array([-1.0, -1.0]), np.array([1.0, 1.0])
+    spread = 1.0 / math.sqrt(max(len(G), 1))
+
+    pending = new_nodes
+    while pending:
+        remaining = []
+        for n in pending:
+            anchors = [pos[m] for m in G.adj[n] if m in pos]
+            if anchors:
+                jitter = np.array([random.uniform(-spread, spread), random.uniform(-spread, spread)])
+                pos[n] = np.mean(anchors, axis=0) + jitter
+            else:
+                remaining.append(n)
+        if len(remaining) == len(pending):
+            for n in remaining:
+                pos[n] = np.array([random.uniform(lo[0], hi[0]), random.uniform(lo[1], hi[1])])
+            break
+        pending = remaining
+
+    if not refine:
+        return pos
+
+    free = {n for n in touched if n in G}
+    free.update(new_nodes)
+    if not free or len(free) > max_nodes:
+        return pos
+    for n in list(free):
+        if len(free) + len(G.adj[n]) <= max_nodes:
+            free.update(G.adj[n])
+    context = set(free)
+    for n in free:
+        for m in G.adj[n]:
+            if len(context) >= 2 * max_nodes:
+                break
+            context.add(m)
+    sub = G.subgraph(context)
+    if sub.number_of_edges() == 0:
+        return pos
+
+    local = nx.spring_layout(
+        sub, pos={n: pos[n] for n in context}, fixed=list(context - free) or None,
+        k=2.0 / math.sqrt(max(len(G), 1)), iterations=iterations, scale=None,
+        weight=layout_weight(sub)
+    )
+    for n in free:
+        pos[n] = local[n]
+    return pos
+
+
+# Far-field interaction list of the grids used for repulsion, as a mask over
+# the 7x7 window of cells around a cell, by the parity of its coordinates:
+# cells not adjacent to it that lie next to its parent cell one level up.
+_OFFSETS = np.arange(-3, 4)
+_FAR_MASK = np.array([
+    [
+        (np.abs((_OFFSETS[:, None] + px) // 2) <= 1) & (np.abs((_OFFSETS[None, :] + py) // 2) <= 1)
+        & (np.maximum(np.abs(_OFFSETS[:, None]), np.abs(_OFFSETS[None, :])) >= 2)
+        for py in range(2)
+    ]
+    for px in range(2)
+])
+_NEAR_OFFSETS = [(0, 0), (1, -1), (1, 0), (1, 1), (0, 1)]
+
+
+def _neighbour_cells(cells, g, dx, dy):
+    # Positions in `cells` (sorted occupied cell ids of a g x g grid) of the
+    # occupied cells at offset (dx, dy) of each one, and of their sources.
+    x, y = cells // g + dx, cells % g + dy
+    target = x * g + y
+    b = np.searchsorted(cells, target).clip(max=len(cells) - 1)
+    ok = (x >= 0) & (x < g) & (y >= 0) & (y < g) & (cells[b] == target)
+    return np.flatnonzero(ok), b[ok]
+
+
+def _cell_pairs(cells, counts, starts, order, g, offset, chunk=2000000):
+    # Index pairs (i, j) of nodes in occupied cells c and c + offset (i < j
+    # within one cell), in chunks of about `chunk` pairs.
+    a, b = _neighbour_cells(cells, g, *offset)
+    na, nb = counts[a], counts[b]
+    total = na * nb
+    bounds = np.searchsorted(np.cumsum(total), np.arange(chunk, total.sum() + chunk, chunk), side="right")
+    first = 0
+    for last in np.unique(np.append(bounds, len(a))):
+        if last <= first:
+            continue
+        tot = total[first:last]
+        pid = np.repeat(np.arange(first, last), tot)
+        within = np.arange(len(pid)) - np.repeat(np.cumsum(tot) - tot, tot)
+        ra, rb = within // nb[pid], within % nb[pid]
+        if offset == (0, 0):
+            keep = ra < rb
+            pid, ra, rb = pid[keep], ra[keep], rb[keep]
+        yield order[starts[a[pid]] + ra], order[starts[b[pid]] + rb]
+        first = last
+
+
+def _far_field_dense(ix, iy, pos, mass, g):
+    # Far field of one level over the full g x g grid, in blocks of rows.
+    flat = ix * g + iy
+    m = np.bincount(flat, mass, g * g).reshape(g, g)
+    filled = m > 0
+    cx = np.divide(np.bincount(flat, mass * pos[:, 0], g * g).reshape(g, g), m, where=filled, out=np.zeros((g, g)))
+    cy = np.divide(np.bincount(flat, mass * pos[:, 1], g * g).reshape(g, g), m, where=filled, out=np.zeros((g, g)))
+    windows = [np.lib.stride_tricks.sliding_window_view(np.pad(a, 3), (7, 7)) for a in (m, cx, cy)]
+    parity = np.arange(g) % 2
+    fx, fy = np.zeros((g, g)), np.zeros((g, g))
+    rows = max(1, 2**21 // (49 * g))
+    for r in range(0, g, rows):
+        block = slice(r, r + rows)
+        wm, wx, wy = (w[block] for w in windows)
+        ddx = cx[block, :, None, None] - wx
+        ddy = cy[block, :, None, None] - wy
+        w = wm * _FAR_MASK[parity[block, None], parity[None, :]]
+        w = np.divide(w, ddx * ddx + ddy * ddy, where=w > 0, out=np.zeros_like(w))
+        fx[block] = (w * ddx).sum(axis=(2, 3))
+        fy[block] = (w * ddy).sum(axis=(2, 3))
+    return fx[ix, iy], fy[ix, iy]
+
+
+def _far_field_sparse(ix, iy, pos, mass, g):
+    # Same far field over the occupied cells only, for grids much larger
+    # than the number of nodes (tight clusters push the depth up).
+    cells, inverse = np.unique(ix * g + iy, return_inverse=True)
+    m = np.bincount(inverse, mass)
+    cx = np.bincount(inverse, mass * pos[:, 0]) / m
+    cy = np.bincount(inverse, mass * pos[:, 1]) / m
+    px, py = cells // g % 2, cells % g % 2
+    fx, fy = np.zeros(len(cells)), np.zeros(len(cells))
+    for dx in _OFFSETS:
+        for dy in _OFFSETS:
+            if not _FAR_MASK[:, :, dx + 3, dy + 3].any():
+                continue
+            a, b = _neighbour_cells(cells, g, dx, dy)
+            keep = _FAR_MASK[px[a], py[a], dx + 3, dy + 3]
+            a, b = a[keep], b[keep]
+            ddx, ddy = cx[a] - cx[b], cy[a] - cy[b]
+            w = m[b] / (ddx * ddx + ddy * ddy)
+            fx += np.bincount(a, w * ddx, len(cells))
+            fy += np.bincount(a, w * ddy, len(cells))
+    return fx[inverse], fy[inverse]
+
+
+def _repulsion(pos, mass, k):
+    # Fruchterman-Reingold repulsion k^2 * m_v / d between every pair, in
+    # O(n log n): positions are binned into grids of 4, 16, 64... cells; at
+    # each level a cell feels the cells of its interaction list through
+    # their mass and centroid, and only nodes of adjacent cells of the
+    # finest grid interact exactly. The finest level is chosen so that
+    # these exact pairs stay linear in n; levels with more cells than 4n
+    # only visit their occupied cells.
+    n = len(pos)
+    force = np.zeros((n, 2))
+    lo = pos.min(axis=0)
+    extent = max(float((pos.max(axis=0) - lo).max()), 1e-12)
+    unit = (pos - lo) / extent * (1 - 1e-9)
+    depth = 2
+    while True:
+        g = 1 << depth
+        cell = (unit[:, 0] * g).astype(np.int64) * g + (unit[:, 1] * g).astype(np.int64)
+        if g * g <= 4 * n:
+            counts = np.bincount(cell, minlength=g * g)
+            cells = np.flatnonzero(counts)
+            counts = counts[cells]
+        else:
+            cells, counts = np.unique(cell, return_counts=True)
+        if depth >= 24 or (counts.astype(float) ** 2).sum() <= 8 * n:
+            break
+        depth += 1
+
+    for level in range(2, depth + 1):
+        g = 1 << level
+        ix = (unit[:, 0] * g).astype(np.int64)
+        iy = (unit[:, 1] * g).astype(np.int64)
+        far_field = _far_field_dense if g * g <= 4 * n else _far_field_sparse
+        fx, fy = far_field(ix, iy, pos, mass, g)
+        force[:, 0] += fx
+        force[:, 1] += fy
+
+    g = 1 << depth
+    order = np.argsort(cell, kind="stable")
+    starts = np.cumsum(counts) - counts
+    floor = (k * 1e-3) ** 2
+    for offset in _NEAR_OFFSETS:
+        for i, j in _cell_pairs(cells, counts, starts, order, g, offset):
+            delta = pos[i] - pos[j]
+            d2 = np.maximum((delta * delta).sum(axis=1), floor)
+            delta /= d2[:, None]
+            for axis in range(2):
+                force[:, axis] += np.bincount(i, delta[:, axis] * mass[j], n)
+                force[:, axis] -= np.bincount(j, delta[:, axis] * mass[i], n)
+    return force * k * k
+
+
+def _force_layout(pos, mass, edges, weights, k, iterations, step, job=None, progress=(0, 1)):
+    # Fruchterman-Reingold iterations with linear cooling from `step`.
+    n = len(pos)
+    u, v = edges
+    start, span = progress
+    for it in range(iterations):
+        if job is not None:
+            job.report(start + span * it / iterations)
+        force = _repulsion(pos, mass, k)
+        delta = pos[v] - pos[u]
+        pull = delta * (np.sqrt((delta * delta).sum(axis=1)) * weights / k)[:, None]
+        for axis in range(2):
+            force[:, axis] += np.bincount(u, pull[:, axis], n) - np.bincount(v, pull[:, axis], n)
+        force /= mass[:, None]
+        length = np.maximum(np.sqrt((force * force).sum(axis=1)), 1e-12)
+        t = step * (1 - it / iterations)
+        pos += force * (np.minimum(length, t) / length)[:, None]
+    return pos
+
+
+def _coarsen(matrix, mass, rng):
+    # One level of coarsening: nodes pair up with their lightest neighbour
+    # when the choice is mutual, unpaired nodes and leaves then join the
+    # group of the neighbour they picked. Returns each node's coarse index.
+    n = matrix.shape[0]
+    indptr, indices = matrix.indptr, matrix.indices
+    degree = np.diff(indptr)
+    nodes = np.arange(n)
+    rows = np.repeat(nodes, degree)
+    key = mass[indices] + rng.random(len(indices)) * 0.5
+    order = np.lexsort((key, rows))
+    linked = degree > 0
+    choice = nodes.copy()
+    choice[linked] = indices[order[indptr[:-1][linked]]]
+    mutual = choice[choice] == nodes
+    rep = np.where(mutual, np.minimum(nodes, choice), nodes)
+    joins = ~mutual & linked & mutual[choice]
+    rep[joins] = rep[choice[joins]]
+    leaves = ~mutual & ~joins & (degree == 1)
+    rep[leaves] = rep[choice[leaves]]
+    return np.unique(rep, return_inverse=True)[1]
+
+
+def _component_layout(matrix, iterations, rng, job=None, progress=(0, 1)):
+    levels = []
+    mass = np.ones(matrix.shape[0])
+    while matrix.shape[0] > 50 and len(levels) < 40:
+        parent = _coarsen(matrix, mass, rng)
+        size = parent.max() + 1
+        if size > 0.9 * matrix.shape[0]:
+            break
+        levels.append((matrix, mass, parent))
+        coo = matrix.tocoo()
+        rows, cols = parent[coo.row], parent[coo.col]
+        outside = rows != cols
+        matrix = sp.csr_matrix((coo.data[outside], (rows[outside], cols[outside])), shape=(size, size))
+        mass = np.bincount(parent, mass, size)
+    levels.append((matrix, mass, None))
+
+    pos = None
+    start, span = progress
+    for depth, (matrix, mass, parent) in enumerate(reversed(levels)):
+        n = matrix.shape[0]
+        k = math.sqrt(1.0 / n)
+        if pos is None:
+            pos = rng.random((n, 2))
+            step = 0.1
+        else:
+            pos = pos[parent] + (rng.random((len(parent), 2)) - 0.5) * k
+            step = 2 * k
+        upper = sp.triu(matrix, k=1).tocoo()
+        # The coarsest level starts from random positions, so it gets twice
+        # the iterations; the others only refine.
+        budget = 2 * iterations if depth == 0 else iterations
+        share = span * n / sum(level[0].shape[0] for level in levels)
+        pos = _force_layout(
+            pos, mass, (upper.row, upper.col), upper.data.astype(float), k, budget, step,
+            job, (start, share)
+        )
+        start += share
+    return pos
+
+
+def _small_components_layout(structure, comps, iterations, rng):
+    # Small components are laid out together in one batch of vectorized
+    # iterations with exact repulsion, restricted to pairs in a component.
+    nodes = np.concatenate(comps)
+    sizes = np.array([len(c) for c in comps])
+    offsets = np.cumsum(sizes) - sizes
+    pairs = [np.triu_indices(n, 1) for n in sizes]
+    i = np.concatenate([p[0] + o for p, o in zip(pairs, offsets)])
+    j = np.concatenate([p[1] + o for p, o in zip(pairs, offsets)])
+    upper = sp.triu(structure[nodes][:, nodes], k=1).tocoo()
+    u, v = upper.row, upper.col
+    k = np.repeat(np.sqrt(1.0 / sizes), sizes)
+    total = len(nodes)
+    pos = rng.random((total, 2))
+    for it in range(iterations):
+        delta = pos[i] - pos[j]
+        d2 = np.maximum((delta * delta).sum(axis=1), 1e-9)
+        push = delta * (k[i] ** 2 / d2)[:, None]
+        delta = pos[v] - pos[u]
+        pull = delta * (np.sqrt((delta * delta).sum(axis=1)) / k[u])[:, None]
+        force = np.zeros((total, 2))
+        for axis in range(2):
+            force[:, axis] = (
+                np.bincount(i, push[:, axis], total) - np.bincount(j, push[:, axis], total)
+                + np.bincount(u, pull[:, axis], total) - np.bincount(v, pull[:, axis], total)
+            )
+        length = np.maximum(np.sqrt((force * force).sum(axis=1)), 1e-12)
+        t = 0.1 * (1 - it / iterations)
+        pos += force * (np.minimum(length, t) / length)[:, None]
+    return np.split(pos, np.cumsum(sizes)[:-1])
+
+
+def _pack_components(blocks):
+    # Shelf packing of component layouts, biggest first, into a roughly
+    # square area. Each block is scaled so its area grows with its size.
+    boxes = []
+    for nodes, pos in blocks:
+        pos = pos - (pos.min(axis=0) + pos.max(axis=0)) / 2
+        radius = np.abs(pos).max()
+        pos = pos / radius * math.sqrt(len(nodes)) / 2 if radius > 0 else pos
+        size = np.abs(pos).max(axis=0) * 2 + 1
+        boxes.append((nodes, pos, size))
+    boxes.sort(key=lambda box: -box[2][1])
+    width = math.sqrt(sum(size[0] * size[1] for _, _, size in boxes)) * 1.2
+    x = y = row_height = 0.0
+    placed = []
+    for nodes, pos, (w, h) in boxes:
+        if x > 0 and x + w > width:
+            x, y, row_height = 0.0, y - row_height, 0.0
+        placed.append((nodes, pos + (x + w / 2, y - h / 2)))
+        x += w
+        row_height = max(row_height, h)
+    return placed
+
+
+def multilevel_layout(G, iterations=30, seed=None, job=None):
+    # Force-directed layout for large graphs: each connected component is
+    # coarsened level by level, laid out from its coarsest level, and the
+    # positions are refined on the way back down with `iterations` steps per
+    # level (twice as many on the coarsest one). Components
+    # are then packed side by side. Positions are centred and scaled to
+    # [-1, 1] like the networkx layouts.
+    if len(G) == 0:
+        return {}
+    rng = np.random.default_rng(seed)
+    matrix = GraphMatrix(G)
+    structure = matrix.structure
+    count, labels = connected_components(structure, directed=False)
+    members = np.argsort(labels, kind="stable")
+    bounds = np.cumsum(np.bincount(labels, minlength=count))
+    blocks, small = [], []
+    done, total = 0, len(G)
+    for comp in np.split(members, bounds[:-1]):
+        n = len(comp)
+        if n == 1:
+            blocks.append((comp, np.zeros((1, 2))))
+        elif n <= 100:
+            small.append(comp)
+        else:
+            sub = structure[comp][:, comp].tocsr()
+            blocks.append((comp, _component_layout(sub, iterations, rng, job, (done / total, n / total))))
+            done += n
+    if small:
+        blocks += zip(small, _small_components_layout(structure, small, 2 * iterations, rng))
+    coords = np.zeros((total, 2))
+    for nodes, pos in _pack_components(blocks):
+        coords[nodes] = pos
+    coords -= coords.mean(axis=0)
+    limit = np.abs(coords).max()
+    if limit > 0:
+        coords /= limit
+    return dict(zip(matrix.nodes, coords))
+
+
+class FilterIndex:
+    # Indexes behind the node filter, over one node order (the canvas one).
+    # Attribute columns are categorical codes, so an equality test is an
+    # np.isin over int32 codes; numeric columns (degree, measures) are kept
+    # sorted so a range is two binary searches. Every condition yields a
+    # boolean mask and masks combine with & or |. Columns are built on
+    # first use and dropped whenever the graph or its attributes change.
+    #
+    # Conditions are tuples:
+    #   ("attribute", key, values)    key equal to one of values
+    #   ("contains", key, text)       key containing text, case-insensitive
+    #   ("range", name, low, high)    "degree" or a measure set with set_measure
+    def __init__(self):
+        self.graph = None
+        self.nodes = []
+        self.stamp = None
+        self.columns = {}
+        self.ranges = {}
+        self.measures = {}
+
+    def reset(self, G, nodes):
+        if G is not self.graph or nodes is not self.nodes:
+            self.graph = G
+            self.nodes = nodes
+            self.stamp = None
+        self._check()
+
+    def _check(self):
+        G = self.graph
+        stamp = (getattr(G, "version", None), getattr(getattr(G, "table", None), "revision", None))
+        if stamp != self.stamp or stamp == (None, None):
+            self.stamp = stamp
+            self.columns.clear()
+            self.ranges.clear()
+
+    def set_measure(self, name, values):
+        self.measures[name] = values
+        self.ranges.pop(name, None)
+
+    def keys(self):
+        table = getattr(self.graph, "table", None)
+        if table is None:
+            return sorted({k for n in self.nodes for k in self.graph.nodes[n]})
+        keys = {key for key, side in table.sparse.items() if side}
+        keys.update(key for key, column in table.archived.items() if column.codes.max(initial=-1) >= 0)
+        keys.update(key for key, column in table.codes.items() if np.frombuffer(column, dtype=np.int32).max(initial=-1) >= 0)
+        return sorted(keys)
+
+    def column(self, key):
+        self._check()
+        if key not in self.columns:
+            self.columns[key] = attribute_codes(self.graph, key, self.nodes)
+        return self.columns[key]
+
+    def counts(self, key):
+        # (value, count) pairs of `key` among the nodes, most frequent first.
+        codes, values = self.column(key)
+        counts = np.bincount(codes[codes >= 0], minlength=len(values))
+        return sorted(((values[c], int(counts[c])) for c in np.flatnonzero(counts)), key=lambda vc: -vc[1])
+
+    def numeric(self, name):
+        # Values of `name` in node order, sorted, with the sorting permutation.
+        self._check()
+        if name not in self.ranges:
+            if name == "degree":
+                degree = self.graph.degree
+                values = np.fromiter((degree[n] for n in self.nodes), dtype=float, count=len(self.nodes))
+            else:
+                measure = self.measures.get(name, {})
+                values = np.fromiter((measure.get(n, np.nan) for n in self.nodes), dtype=float, count=len(self.nodes))
+            order = np.argsort(values, kind="stable")
+            self.ranges[name] = (values[order], order)
+        return self.ranges[name]
+
+    def mask(self, condition):
+        kind, name, *args = condition
+        mask = np.zeros(len(self.nodes), dtype=bool)
+        if kind == "range":
+            low, high = args
+            values, order = self.numeric(name)
+            mask[order[np.searchsorted(values, low, "left"):np.searchsorted(values, high, "right")]] = True
+            return mask
+        codes, values = self.column(name)
+        if kind == "attribute":
+            wanted = set(args[0])
+            accepted = [c for c, v in enumerate(values) if v in wanted]
+        else:
+            text = args[0].lower()
+            accepted = [c for c, v in enumerate(values) if text in str(v).lower()]
+        return np.isin(codes, accepted)
+
+    @profiled("filtre", "FilterIndex.evaluate")
+    def evaluate(self, conditions, mode="and"):
+        # None when there is nothing to filter out.
+        if not conditions:
+            return None
+        masks = [self.mask(c) for c in conditions]
+        return functools.reduce(np.logical_and if mode == "and" else np.logical_or, masks)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, key, title, on_done):
+        self.key = key
+        self.title = title
+        self.on_done = on_done
+        self.cancel_event = threading.Event()
+        self.progress_callback = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def report(self, fraction=None):
+        # fraction=None means the amount of work left is unknown.
+        if self.cancelled:
+            raise JobCancelled()
+        if self.progress_callback is not None:
+            self.progress_callback(self, fraction)
+
+
+def layout_options(G, layout_func, iterations=None):
+    # Keyword arguments for one of the LAYOUTS on G; iterations=None keeps
+    # the layout's own default budget.
+    options = {"iterations": iterations} if iterations and layout_func in FORCE_LAYOUTS else {}
+    if layout_func in (nx.spring_layout, nx.spectral_layout):
+        options["weight"] = layout_weight(G)
+    return options
+
+
+def compute_layout(G, layout_func, iterations, job):
+    job.report()
+    options = layout_options(G, layout_func, iterations)
+    with profiler.span(layout_func.__name__, "layout", **graph_size(G)):
+        if layout_func is multilevel_layout:
+            return layout_func(G, job=job, **options)
+        if layout_func is nx.spring_layout:
+            return _spring_layout(G, job, **options)
+        return layout_func(G, **options)
+
+
+def _spring_layout(G, job, iterations=50, **options):
+    # nx.spring_layout only returns once done: run it a few iterations at a
+    # time from the previous positions so the job can report and be
+    # cancelled in between. Each run cools down from scratch, so small
+    # graphs, which are quick anyway, get few and long runs.
+    chunk = max(5, 25000 // max(len(G), 1))
+    pos = None
+    for done in range(0, iterations, chunk):
+        job.report(done / iterations)
+        pos = nx.spring_layout(G, pos=pos, iterations=min(chunk, iterations - done), **options)
+    return pos
+
+
+def compute_clustering(matrix, job):
+    return matrix.clustering(job=job)
+
+
+def compute_pagerank(matrix, nstart, job):
+    return matrix.pagerank(nstart=nstart, job=job)
+
+
+# Worker side of the centrality pool: each process gets the adjacency lists
+# once through the initializer and then handles batches of BFS sources.
+_centrality_adj = None
+
+
+def _adjacency_lists(indptr, indices):
+    indices = indices.tolist()
+    return [indices[indptr[i]:indptr[i + 1]] for i in range(len(indptr) - 1)]
+
+
+def _init_centrality_worker(indptr, indices):
+    global _centrality_adj
+    _centrality_adj = _adjacency_lists(indptr, indices)
+
+
+@contextlib.contextmanager
+def _spawn_without_main():
+    # Spawned children re-run the parent's __main__, which from the GUI
+    # would import PyQt5 and matplotlib in every worker. With a bare
+    # __main__ while they start, they only import this module to unpickle
+    # their functions.
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _betweenness_batch(sources, adj=None):
+    # Brandes' dependency accumulation for unweighted graphs.
+    adj = adj or _centrality_adj
+    bc = np.zeros(len(adj))
+    for s in sources:
+        order = []
+        preds = {s: []}
+        sigma = {s: 1}
+        dist = {s: 0}
+        queue = deque([s])
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            dv = dist[v] + 1
+            sv = sigma[v]
+            for w in adj[v]:
+                if w not in dist:
+                    dist[w] = dv
+                    sigma[w] = 0
+                    preds[w] = []
+                    queue.append(w)
+                if dist[w] == dv:
+                    sigma[w] += sv
+                    preds[w].append(v)
+        delta = dict.fromkeys(order, 0.0)
+        for w in reversed(order):
+            coeff = (1.0 + delta[w]) / sigma[w]
+            for v in preds[w]:
+                delta[v] += sigma[v] * coeff
+            if w != s:
+                bc[w] += delta[w]
+    return bc
+
+
+def _distance_batch(sources, adj=None):
+    # Sum of BFS distances from the batch's sources to every node.
+    adj = adj or _centrality_adj
+    totals = np.zeros(len(adj))
+    for s in sources:
+        dist = {s: 0}
+        frontier = [s]
+        depth = 0
+        while frontier:
+            depth += 1
+            nxt = []
+            for v in frontier:
+                for w in adj[v]:
+                    if w not in dist:
+                        dist[w] = depth
+                        nxt.append(w)
+            frontier = nxt
+        idx = np.fromiter(dist.keys(), dtype=np.int64, count=len(dist))
+        totals[idx] += np.fromiter(dist.values(), dtype=float, count=len(dist))
+    return totals
+
+
+def _run_sources(matrix, batch_func, sources, minimum, budget, processes, job):
+    # Runs batches of sources, in a process pool when more than one process
+    # is requested. Once `minimum` sources are done, no new batch is started
+    # after the time budget runs out. Returns the summed batch results and
+    # the sources that were actually processed.
+    structure = matrix.structure
+    n = structure.shape[0]
+    deadline = time.monotonic() + budget if budget else math.inf
+    # Batches stay around a million adjacency visits so the budget and
+    # cancellation are checked often even on large graphs.
+    size = max(1, min(256, len(sources) // (4 * processes), 1000000 // (structure.nnz + n)))
+    batches = [sources[i:i + size] for i in range(0, len(sources), size)]
+    total = np.zeros(n)
+    done = []
+    job.report(0.0)
+    if processes <= 1:
+        adj = _adjacency_lists(structure.indptr, structure.indices)
+        for batch in batches:
+            if len(done) >= minimum and time.monotonic() > deadline:
+                break
+            total += batch_func(batch, adj)
+            done.extend(batch)
+            job.report(len(done) / len(sources))
+        return total, done
+
+    with _spawn_without_main():
+        executor = ProcessPoolExecutor(
+            max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_centrality_worker, initargs=(structure.indptr, structure.indices)
+        )
+        # Workers are spawned as tasks are submitted: start them all here.
+        for _ in range(processes):
+            executor.submit(int)
+    try:
+        pending = {}
+        queued = iter(batches)
+        submitted = 0
+        while True:
+            while len(pending) < 2 * processes and (submitted < minimum or time.monotonic() <= deadline):
+                batch = next(queued, None)
+                if batch is None:
+                    break
+                pending[executor.submit(batch_func, batch)] = batch
+                submitted += len(batch)
+            if not pending:
+                break
+            finished, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in finished:
+                total += future.result()
+                done.extend(pending.pop(future))
+            job.report(len(done) / len(sources))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return total, done
+
+
+@profiled("analyse")
+def compute_betweenness(matrix, pivots, budget, processes, job):
+    # Same normalization as nx.betweenness_centrality; with fewer pivots
+    # than nodes the sum over sampled sources is scaled up by n / k.
+    n = len(matrix.nodes)
+    sources = np.random.permutation(n)[:pivots or n].tolist()
+    total, done = _run_sources(matrix, _betweenness_batch, sources, 1, budget, processes, job)
+    if n > 2:
+        total *= n / ((n - 1) * (n - 2) * len(done))
+    return matrix.to_dict(total)
+
+
+@profiled("analyse")
+def compute_closeness(matrix, pivots, budget, processes, job):
+    # Exact when every node is a source. Otherwise the distance sums are
+    # estimated per component from its sampled pivots (Eppstein-Wang); one
+    # pivot per component is always processed so every node gets a value.
+    n = len(matrix.nodes)
+    _, labels = connected_components(matrix.structure, directed=False)
+    sizes = np.bincount(labels)
+    _, first = np.unique(labels, return_index=True)
+    rest = np.setdiff1d(np.arange(n), first)
+    np.random.shuffle(rest)
+    sources = first.tolist() + rest[:max((pivots or n) - len(first), 0)].tolist()
+    total, done = _run_sources(matrix, _distance_batch, sources, len(first), budget, processes, job)
+    sampled = np.bincount(labels[done], minlength=len(sizes))
+    reach = sizes[labels].astype(float)
+    total *= reach / sampled[labels]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(total > 0, (reach - 1) ** 2 / (total * max(n - 1, 1)), 0.0)
+    return matrix.to_dict(values)
+
+
+@profiled("io")
+def read_csv_graph(path, G, job, chunk_size=50000):
+    # Streams the file in chunks and bulk-inserts each one. Columns named
+    # source_<attr> / target_<attr> become node attributes, every other
+    # column an edge attribute; empty cells are skipped.
+    size = os.path.getsize(path) or 1
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        if "source" not in header or "target" not in header:
+            raise ValueError("Le fichier doit contenir les colonnes 'source' et 'target'.")
+        src_i, tgt_i = header.index("source"), header.index("target")
+        src_cols = [(name[7:], i) for i, name in enumerate(header) if name.startswith("source_")]
+        tgt_cols = [(name[7:], i) for i, name in enumerate(header) if name.startswith("target_")]
+        edge_cols = [
+            (name, i) for i, name in enumerate(header)
+            if name not in ("source", "target") and not name.startswith(("source_", "target_"))
+        ]
+        width = len(header)
+
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                break
+            # Duplicate rows collapse in the graph itself: add_*_from merges
+            # the attributes of nodes and edges that already exist.
+            nodes = {}
+            edges = []
+            for row in rows:
+                if len(row) < width:
+                    row += [""] * (width - len(row))
+                u, v = row[src_i].strip(), row[tgt_i].strip()
+                if not u or not v:
+                    continue
+                for node, cols in ((u, src_cols), (v, tgt_cols)):
+                    if not cols:
+                        continue
+                    attrs = nodes.get(node)
+                    if attrs is None:
+                        attrs = nodes[node] = {}
+                    for attr, i in cols:
+                        if row[i]:
+                            attrs[attr] = row[i]
+                if edge_cols:
+                    attrs = {name: row[i] for name, i in edge_cols if row[i]}
+                    if "weight" in attrs:
+                        _parse_weight(attrs)
+                    edges.append((u, v, attrs))
+                else:
+                    edges.append((u, v))
+
+            G.add_edges_from(edges)
+            G.add_nodes_from(nodes.items())
+            job.report(min(f.buffer.tell() / size, 1.0))
+    return G
+
+
+def _parse_weight(attrs):
+    # Layouts and analyses need a number: a weight that is not one is kept
+    # as text under weight_raw instead.
+    try:
+        weight = float(attrs["weight"])
+    except ValueError:
+        weight = math.nan
+    if math.isfinite(weight):
+        attrs["weight"] = weight
+    else:
+        attrs["weight_raw"] = attrs.pop("weight")
+
+
+_part_ids = itertools.count()
+
+
+@contextlib.contextmanager
+def _atomic_write(path):
+    # Writers fill a temporary file next to `path` and only move it in place
+    # once complete: a cancelled or failed write leaves neither a truncated
+    # file nor a damaged previous version behind.
+    directory, name = os.path.split(os.path.abspath(path))
+    part = os.path.join(directory, f".{name}.{os.getpid()}-{next(_part_ids)}.part")
+    try:
+        yield part
+        os.replace(part, path)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+
+
+@profiled("io")
+def write_csv_graph(G, path, job, chunk_size=50000):
+    node_fields = sorted({k for _, d in G.nodes(data=True) for k in d if k != "value"})
+    edge_fields = sorted({k for _, _, d in G.edges(data=True) for k in d})
+    header = ["source", "target"]
+    header += [f"source_{k}" for k in node_fields] + [f"target_{k}" for k in node_fields]
+    header += edge_fields
+
+    # Node cells are looked up once per node rather than once per edge end.
+    cells = {n: [d.get(k, "") for k in node_fields] for n, d in G.nodes(data=True)}
+    rows = (
+        [u, v] + cells[u] + cells[v] + [d.get(k, "") for k in edge_fields]
+        for u, v, d in G.edges(data=True)
+    )
+    total = max(G.number_of_edges(), 1)
+    with _atomic_write(path) as part, open(part, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        written = 0
+        while True:
+            chunk = list(itertools.islice(rows, chunk_size))
+            if not chunk:
+                break
+            writer.writerows(chunk)
+            written += len(chunk)
+            job.report(written / total)
+
+
+PROJECT_VERSION = 1
+
+
+def _pack_strings(values):
+    # One UTF-8 blob plus character offsets, no pickling involved.
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(v) for v in values), dtype=np.int64, count=len(values)), out=offsets[1:])
+    return np.frombuffer("".join(values).encode("utf-8"), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob, offsets):
+    text = blob.tobytes().decode("utf-8")
+    offsets = offsets.tolist()
+    return [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+
+def _pack_column(arrays, prefix, values):
+    # Attribute columns are categorical: int32 codes (-1 when the attribute
+    # is not set) into a table of distinct values, so repeated values such
+    # as the node type are stored once.
+    categories = {}
+    codes = np.fromiter(
+        (-1 if v is None else categories.setdefault(v, len(categories)) for v in values),
+        dtype=np.int32, count=len(values)
+    )
+    arrays[f"{prefix}/codes"] = codes
+    arrays[f"{prefix}/values"], arrays[f"{prefix}/offsets"] = _pack_strings(list(categories))
+
+
+def _unpack_column(archive, prefix, encoding):
+    table = _unpack_strings(archive[f"{prefix}/values"], archive[f"{prefix}/offsets"])
+    if encoding == "json":
+        table = [json.loads(v) for v in table]
+    return archive[f"{prefix}/codes"], table
+
+
+def _attribute_columns(items, arrays, prefix):
+    keys = sorted({k for d in items for k in d})
+    encodings = {}
+    for key in keys:
+        raw = [d.get(key) for d in items]
+        if all(v is None or isinstance(v, str) for v in raw):
+            encodings[key] = "str"
+        else:
+            encodings[key] = "json"
+            raw = [None if v is None else json.dumps(v) for v in raw]
+        _pack_column(arrays, f"{prefix}/{key}", raw)
+    return encodings
+
+
+@profiled("io")
+def write_project(path, G, pos, measure, measure_name, layout, job):
+    job.report()
+    nodes = list(G.nodes)
+    index = {n: i for i, n in enumerate(nodes)}
+    int_keys = all(isinstance(n, int) and not isinstance(n, bool) for n in nodes)
+    arrays = {}
+    arrays["nodes/values"], arrays["nodes/offsets"] = _pack_strings([str(n) for n in nodes])
+
+    # Walking the adjacency directly is much cheaper than G.edges(data=True);
+    # each undirected edge is kept from its lower-indexed end.
+    us, vs, edge_data = [], [], []
+    for u, nbrs in G.adj.items():
+        iu = index[u]
+        for v, d in nbrs.items():
+            iv = index[v]
+            if iv >= iu:
+                us.append(iu)
+                vs.append(iv)
+                edge_data.append(d)
+    arrays["edges/u"] = np.array(us, dtype=np.int64)
+    arrays["edges/v"] = np.array(vs, dtype=np.int64)
+
+    node_attrs = _attribute_columns([d for _, d in G.nodes(data=True)], arrays, "node_attrs")
+    edge_attrs = _attribute_columns(edge_data, arrays, "edge_attrs")
+
+    coords = np.full((len(nodes), 2), np.nan)
+    for n, p in pos.items():
+        if n in index:
+            coords[index[n]] = p[:2]
+    arrays["pos"] = coords
+    if measure:
+        arrays["measure"] = np.array([measure.get(n, np.nan) for n in nodes], dtype=float)
+
+    meta = {
+        "version": PROJECT_VERSION,
+        "int_keys": int_keys,
+        "node_attrs": node_attrs,
+        "edge_attrs": edge_attrs,
+        "measure_name": measure_name,
+        "layout": layout,
+    }
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    # Writing through a file object keeps np.savez from appending ".npz".
+    with _atomic_write(path) as part, open(part, "wb") as f:
+        np.savez_compressed(f, **arrays)
+
+
+def _load_node_columns(G, nodes, archive, encodings):
+    # Node attributes are not decoded up front: categorical fields go
+    # straight into the node table, the others become ArchiveColumns.
+    table = G.table
+    rows = np.fromiter((G._node[n].row for n in nodes), dtype=np.int64, count=len(nodes))
+    for key, encoding in encodings.items():
+        prefix = f"node_attrs/{key}"
+        codes = np.full(table.rows, -1, dtype=np.int32)
+        codes[rows] = archive[f"{prefix}/codes"]
+        text = archive[f"{prefix}/values"].tobytes().decode("utf-8")
+        offsets = archive[f"{prefix}/offsets"]
+        if key in table.codes and encoding == "str":
+            values = [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+            table.codes[key] = array("i", codes.tobytes())
+            table.categories[key] = (values, {v: i for i, v in enumerate(values)})
+        else:
+            table.archived[key] = ArchiveColumn(codes, text, offsets, encoding)
+
+
+@profiled("io")
+def read_project(path, job):
+    job.report()
+    with np.load(path, allow_pickle=False) as archive:
+        meta = json.loads(archive["meta"].tobytes().decode("utf-8"))
+        if meta.get("version", 0) > PROJECT_VERSION:
+            raise ValueError("Ce projet a été créé par une version plus récente.")
+        nodes = _unpack_strings(archive["nodes/values"], archive["nodes/offsets"])
+        if meta["int_keys"]:
+            nodes = [int(n) for n in nodes]
+
+        u, v = archive["edges/u"].tolist(), archive["edges/v"].tolist()
+        edge_data = [{} for _ in u]
+        for key, encoding in meta["edge_attrs"].items():
+            codes, table = _unpack_column(archive, f"edge_attrs/{key}", encoding)
+            for i in np.flatnonzero(codes >= 0).tolist():
+                edge_data[i][key] = table[codes[i]]
+
+        G = VersionedGraph()
+        G.add_nodes_from(nodes)
+        _load_node_columns(G, nodes, archive, meta["node_attrs"])
+        G.add_edges_from(zip((nodes[i] for i in u), (nodes[i] for i in v), edge_data))
+
+        coords = archive["pos"]
+        placed = ~np.isnan(coords).any(axis=1)
+        pos = {nodes[i]: coords[i] for i in np.flatnonzero(placed).tolist()}
+
+        measure = None
+        if "measure" in archive.files:
+            values = archive["measure"]
+            measure = {nodes[i]: float(values[i]) for i in np.flatnonzero(~np.isnan(values)).tolist()}
+    return G, pos, measure, meta
+
+
+class GraphStore:
+    # SQLite-backed investigation. Each undirected edge is stored in both
+    # directions in a WITHOUT ROWID table keyed by (src, dst), so the
+    # neighbours of a node are one clustered index range scan. Only the
+    # working set the viewer asks for is ever materialized as an nx.Graph.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS nodes (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            attrs TEXT
+        );
+        CREATE TABLE IF NOT EXISTS edges (
+            src INTEGER NOT NULL,
+            dst INTEGER NOT NULL,
+            attrs TEXT,
+            PRIMARY KEY (src, dst)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS edges_dst ON edges (dst);
+    """
+    BATCH = 900
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.executescript(self.SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _dump(attrs):
+        return json.dumps(dict(attrs)) if attrs else None
+
+    @staticmethod
+    def _load(attrs):
+        return json.loads(attrs) if attrs else {}
+
+    def node_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+
+    def write_graph(self, G, job, chunk_size=50000):
+        nodes = [(str(n), self._dump(d)) for n, d in G.nodes(data=True)]
+        edges = [(str(u), str(v), self._dump(d)) for u, v, d in G.edges(data=True)]
+        total = max(len(nodes) + len(edges), 1)
+        with self.transaction():
+            for i in range(0, len(nodes), chunk_size):
+                job.report(i / total)
+                self.conn.executemany(
+                    "INSERT INTO nodes (name, attrs) VALUES (?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET attrs = excluded.attrs",
+                    nodes[i:i + chunk_size]
+                )
+            ids = dict(self.conn.execute("SELECT name, id FROM nodes"))
+            for i in range(0, len(edges), chunk_size):
+                job.report((len(nodes) + i) / total)
+                rows = []
+                for u, v, attrs in edges[i:i + chunk_size]:
+                    rows.append((ids[u], ids[v], attrs))
+                    rows.append((ids[v], ids[u], attrs))
+                self.conn.executemany("INSERT OR REPLACE INTO edges VALUES (?, ?, ?)", rows)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.conn.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def find(self, names):
+        found = {}
+        names = [str(n) for n in names]
+        for i in range(0, len(names), self.BATCH):
+            chunk = names[i:i + self.BATCH]
+            marks = ",".join("?" * len(chunk))
+            for node_id, name, attrs in self.conn.execute(
+                f"SELECT id, name, attrs FROM nodes WHERE name IN ({marks})", chunk
+            ):
+                found[name] = (node_id, self._load(attrs))
+        return found
+
+    def degree(self, name):
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM edges JOIN nodes ON nodes.id = edges.src WHERE nodes.name = ?",
+            (str(name),)
+        ).fetchone()
+        return row[0]
+
+    def _edges_from(self, ids):
+        ids = list(ids)
+        for i in range(0, len(ids), self.BATCH):
+            chunk = ids[i:i + self.BATCH]
+            marks = ",".join("?" * len(chunk))
+            yield from self.conn.execute(
+                "SELECT s.name, d.id, d.name, d.attrs, e.attrs FROM edges e "
+                "JOIN nodes s ON s.id = e.src JOIN nodes d ON d.id = e.dst "
+                f"WHERE e.src IN ({marks})", chunk
+            )
+
+    @profiled("io", "GraphStore.expand")
+    def expand(self, G, names):
+        # Adds the neighbours of `names` to the working set G together with
+        # every stored edge between a new node and a node already loaded.
+        found = self.find(n for n in names if n in G)
+        rows = list(self._edges_from(node_id for node_id, _ in found.values()))
+        new_nodes = {}
+        for _, dst_id, dst, dst_attrs, _ in rows:
+            if dst not in G:
+                new_nodes[dst] = (dst_id, self._load(dst_attrs))
+        G.add_nodes_from((name, attrs) for name, (_, attrs) in new_nodes.items())
+
+        new_ids = [node_id for node_id, _ in new_nodes.values()]
+        for src, _, dst, _, attrs in itertools.chain(rows, self._edges_from(new_ids)):
+            if dst in G and not G.has_edge(src, dst):
+                G.add_edge(src, dst, **self._load(attrs))
+        return list(new_nodes)
+
+    def ego_graph(self, seeds, radius=1):
+        G = VersionedGraph()
+        G.add_nodes_from((name, attrs) for name, (_, attrs) in self.find(seeds).items())
+        frontier = list(G.nodes)
+        for _ in range(radius):
+            frontier = self.expand(G, frontier)
+        return G
+
+    def _id(self, name, attrs=None):
+        self.conn.execute(
+            "INSERT INTO nodes (name, attrs) VALUES (?, ?) ON CONFLICT (name) DO NOTHING",
+            (str(name), self._dump(attrs))
+        )
+        return self.conn.execute("SELECT id FROM nodes WHERE name = ?", (str(name),)).fetchone()[0]
+
+    def add_node(self, name, attrs):
+        self.conn.execute(
+            "INSERT INTO nodes (name, attrs) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET attrs = excluded.attrs",
+            (str(name), self._dump(attrs))
+        )
+
+    def add_edge(self, u, v, attrs=None):
+        iu, iv = self._id(u), self._id(v)
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO edges VALUES (?, ?, ?)",
+            [(iu, iv, self._dump(attrs)), (iv, iu, self._dump(attrs))]
+        )
+
+    def remove_node(self, name):
+        row = self.conn.execute("SELECT id FROM nodes WHERE name = ?", (str(name),)).fetchone()
+        if row is None:
+            return
+        self.conn.execute("DELETE FROM edges WHERE src = ? OR dst = ?", (row[0], row[0]))
+        self.conn.execute("DELETE FROM nodes WHERE id = ?", (row[0],))
+
+    def remove_edges(self, edges):
+        found = self.find({n for edge in edges for n in edge})
+        rows = []
+        for u, v in edges:
+            if str(u) in found and str(v) in found:
+                iu, iv = found[str(u)][0], found[str(v)][0]
+                rows += [(iu, iv), (iv, iu)]
+        self.conn.executemany("DELETE FROM edges WHERE src = ? AND dst = ?", rows)
+
+
+@profiled("io")
+def write_store(path, G, job):
+    with _atomic_write(path) as part:
+        store = GraphStore(part)
+        try:
+            store.write_graph(G, job)
+        finally:
+            store.close()
+
+
+def working_set_evictions(G, focus, max_nodes, keep=()):
+    # Nodes to drop so that at most max_nodes remain, farthest (in hops)
+    # from the focus nodes first; unreachable nodes go before anything else.
+    # Nodes in `keep` are never dropped.
+    if len(G) <= max_nodes:
+        return []
+    dist = {n: 0 for n in focus if n in G}
+    queue = deque(dist)
+    while queue:
+        n = queue.popleft()
+        for m in G.adj[n]:
+            if m not in dist:
+                dist[m] = dist[n] + 1
+                queue.append(m)
+    keep = set(keep)
+    ranked = sorted((n for n in G if n not in keep), key=lambda n: dist.get(n, math.inf), reverse=True)
+    return ranked[:len(G) - max_nodes]
+
+
+class GraphBatch:
+    # A group of edits applied as one unit. Each operation is applied at once
+    # and logged with the node or edge state it replaced, so the batch can
+    # be reverted and replayed later from these deltas alone instead of a
+    # snapshot. Used as a context manager it is also a transaction: if the
+    # block raises, the edits made so far are rolled back, in the store too.
+    # The caller relayouts and redraws once afterwards, around `touched`.
+    def __init__(self, G, title="", store=None):
+        self.graph = G
+        self.title = title
+        self.store = store
+        self.ops = []
+        self.touched = set()
+        # Positions of the nodes the batch removes (or its undo removes),
+        # filled in by the viewer so they come back where they were.
+        self.positions = {}
+        self.stack = None
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __enter__(self):
+        self.stack = contextlib.ExitStack()
+        if self.store is not None:
+            self.stack.enter_context(self.store.transaction())
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is not None:
+            self._apply(self.ops[::-1], 2, None)
+            self.ops.clear()
+            self.touched.clear()
+        return self.stack.__exit__(*exc)
+
+    def add_nodes(self, nodes, **attrs):
+        # Adds the nodes, merging attrs into the ones that already exist.
+        G = self.graph
+        ops = []
+        for n in dict.fromkeys(nodes):
+            before = dict(G.nodes[n]) if n in G else None
+            after = {**(before or {}), **attrs}
+            if before != after:
+                ops.append(("node", n, before, after))
+        self._record(ops)
+
+    def add_node(self, node, **attrs):
+        self.add_nodes([node], **attrs)
+
+    def remove_nodes(self, nodes):
+        G = self.graph
+        nodes = [n for n in dict.fromkeys(nodes) if n in G]
+        edges = {}
+        for n in nodes:
+            for m, data in G.adj[n].items():
+                if (m, n) not in edges:
+                    edges[n, m] = data
+        self._record(
+            [("edge", e, dict(data), None) for e, data in edges.items()]
+            + [("node", n, dict(G.nodes[n]), None) for n in nodes]
+        )
+
+    def remove_node(self, node):
+        self.remove_nodes([node])
+
+    def add_edges(self, edges, **attrs):
+        # Missing endpoints are created bare; existing edges get attrs merged.
+        G = self.graph
+        edges = list(edges)
+        self.add_nodes(n for e in edges for n in e if n not in G)
+        ops = {}
+        for u, v in edges:
+            if (v, u) in ops:
+                continue
+            before = dict(G.adj[u][v]) if G.has_edge(u, v) else None
+            after = {**(before or {}), **attrs}
+            if before != after:
+                ops[u, v] = ("edge", (u, v), before, after)
+        self._record(list(ops.values()))
+
+    def add_edge(self, u, v, **attrs):
+        self.add_edges([(u, v)], **attrs)
+
+    def remove_edges(self, edges):
+        G = self.graph
+        ops = {}
+        for u, v in edges:
+            if G.has_edge(u, v) and (v, u) not in ops:
+                ops[u, v] = ("edge", (u, v), dict(G.adj[u][v]), None)
+        self._record(list(ops.values()))
+
+    def remove_edge(self, u, v):
+        self.remove_edges([(u, v)])
+
+    def nodes(self):
+        # Nodes the batch created, removed or changed the attributes of.
+        return {key for kind, key, _, _ in self.ops if kind == "node"}
+
+    def revert(self):
+        with self.store.transaction() if self.store is not None else contextlib.nullcontext():
+            self._apply(self.ops[::-1], 2, self.store)
+
+    def replay(self):
+        with self.store.transaction() if self.store is not None else contextlib.nullcontext():
+            self._apply(self.ops, 3, self.store)
+
+    def _record(self, ops):
+        self._apply(ops, 3, self.store)
+        self.ops += ops
+        for kind, key, _, _ in ops:
+            if kind == "node":
+                self.touched.add(key)
+            else:
+                self.touched.update(key)
+
+    def _apply(self, ops, side, store):
+        # Brings every node or edge of `ops` to its before (side 2) or after
+        # (side 3) state, in bulk for each run of same-kind operations.
+        G = self.graph
+        # Existing attributes are updated in place: mark the whole batch as
+        # one edit for GraphSnapshot readers.
+        with G.editing() if isinstance(G, VersionedGraph) else contextlib.nullcontext():
+            self._apply_groups(G, ops, side, store)
+
+    def _apply_groups(self, G, ops, side, store):
+        for (kind, removal), group in itertools.groupby(ops, key=lambda op: (op[0], op[side] is None)):
+            group = [(op[1], op[side]) for op in group]
+            if kind == "node" and removal:
+                G.remove_nodes_from(n for n, _ in group)
+                for n, _ in group:
+                    if store is not None:
+                        store.remove_node(n)
+            elif kind == "node":
+                new = []
+                for n, attrs in group:
+                    if n in G:
+                        data = G.nodes[n]
+                        data.clear()
+                        data.update(attrs)
+                    else:
+                        new.append((n, attrs))
+                    if store is not None:
+                        store.add_node(n, attrs)
+                G.add_nodes_from(new)
+            elif removal:
+                edges = [e for e, _ in group if G.has_edge(*e)]
+                G.remove_edges_from(edges)
+                if store is not None:
+                    store.remove_edges(edges)
+            else:
+                new = []
+                for (u, v), attrs in group:
+                    if G.has_edge(u, v):
+                        data = G.adj[u][v]
+                        data.clear()
+                        data.update(attrs)
+                    else:
+                        new.append((u, v, attrs))
+                    if store is not None:
+                        store.add_edge(u, v, attrs)
+                G.add_edges_from(new)
+
+
+class EditHistory:
+    # Undo and redo stacks of GraphBatch deltas, bounded to `limit` batches.
+    def __init__(self, limit=100):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+
+    def push(self, batch):
+        if batch.ops:
+            self.undo_stack.append(batch)
+            self.redo_stack.clear()
+
+    def undo(self):
+        if not self.undo_stack:
+            return None
+        batch = self.undo_stack.pop()
+        batch.revert()
+        self.redo_stack.append(batch)
+        return batch
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        batch = self.redo_stack.pop()
+        batch.replay()
+        self.undo_stack.append(batch)
+        return batch
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+
+BULK_SEPARATOR = re.compile(r"\s*(?:<->|->|--|;|\t)\s*")
+
+
+def parse_bulk_text(text):
+    # One item per line: a node value, or values separated by "--", "->",
+    # ";" or a tab, which links each value to the next one.
+    nodes, edges = {}, {}
+    for line in text.splitlines():
+        parts = [p for p in BULK_SEPARATOR.split(line.strip()) if p]
+        nodes.update(dict.fromkeys(parts))
+        edges.update(dict.fromkeys((u, v) for u, v in zip(parts, parts[1:]) if u != v))
+    return list(nodes), list(edges)
+
+
+class Supernode:
+    # Display node standing for a whole community in the overview.
+    __slots__ = ("id", "size")
+
+    def __init__(self, id, size):
+        self.id = id
+        self.size = size
+
+    def __eq__(self, other):
+        return isinstance(other, Supernode) and other.id == self.id
+
+    def __hash__(self):
+        return hash((Supernode, self.id))
+
+    def __str__(self):
+        return f"Communauté {self.id + 1} ({self.size})"
+
+    __repr__ = __str__
+
+
+@profiled("analyse")
+def detect_communities(G, job, direct_limit=5000, max_communities=500):
+    # Louvain is used directly on small graphs. Larger ones first go through
+    # label propagation, and when that leaves too many communities Louvain
+    # merges them on the weighted quotient graph.
+    if len(G) <= direct_limit:
+        job.report()
+        return nx.community.louvain_communities(G, weight=layout_weight(G), seed=0)
+    job.report(0.0)
+    communities = [list(c) for c in nx.community.fast_label_propagation_communities(G, seed=0)]
+    if len(communities) <= max_communities:
+        return communities
+    job.report(0.5)
+    community = {n: i for i, members in enumerate(communities) for n in members}
+    Q = nx.Graph()
+    Q.add_nodes_from(range(len(communities)))
+    # Internal edges become self-loops so Louvain keeps dense groups apart.
+    for u, v in G.edges():
+        a, b = community[u], community[v]
+        if Q.has_edge(a, b):
+            Q[a][b]["weight"] += 1
+        else:
+            Q.add_edge(a, b, weight=1)
+    merged = nx.community.louvain_communities(Q, weight="weight", seed=0)
+    return [[n for c in group for n in communities[c]] for group in merged]
+
+
+class CommunityView:
+    # Coarsened view of a graph: each community is drawn as one supernode
+    # until it is expanded in place. Only the coarse graph and the expanded
+    # communities are ever laid out, and the view is tied to the graph
+    # version it was built from.
+    def __init__(self, G, communities, layout_func):
+        self.graph = G
+        self.version = G.version
+        self.layout_func = layout_func
+        self.members = sorted((list(c) for c in communities), key=len, reverse=True)
+        self.supernodes = [Supernode(i, len(m)) for i, m in enumerate(self.members)]
+        self.community = {n: i for i, m in enumerate(self.members) for n in m}
+        self.types = [self.dominant_type(m) for m in self.members]
+        self.expanded = {}
+
+        self.coarse = nx.Graph()
+        self.coarse.add_nodes_from(range(len(self.members)))
+        for u, v in G.edges():
+            a, b = self.community[u], self.community[v]
+            if a == b:
+                continue
+            if self.coarse.has_edge(a, b):
+                self.coarse[a][b]["weight"] += 1
+            else:
+                self.coarse.add_edge(a, b, weight=1)
+        self.coarse_pos = layout_func(self.coarse) if len(self.coarse) > 1 else {0: np.zeros(2)}
+        self.spacing = 1.0 / math.sqrt(len(self.members))
+
+    def dominant_type(self, members):
+        counts = {}
+        for n in members:
+            typ = self.graph.nodes[n].get("type", "autre")
+            counts[typ] = counts.get(typ, 0) + 1
+        return max(counts, key=counts.get)
+
+    @profiled("layout")
+    def layout_members(self, cid, sub, job):
+        # Members are laid out on their own and scaled into a disc whose
+        # area grows with the community, centred on the supernode.
+        members = self.members[cid]
+        job.report()
+        if len(members) > 1:
+            pos = self.layout_func(sub, **layout_options(sub, self.layout_func))
+        else:
+            pos = {members[0]: np.zeros(2)}
+        coords = np.array([pos[n] for n in members], dtype=float).reshape(-1, 2)
+        coords -= coords.mean(axis=0)
+        extent = np.abs(coords).max() or 1.0
+        radius = self.spacing * math.sqrt(len(members) / len(self.members[0]))
+        coords = coords * (radius / extent) + self.coarse_pos[cid]
+        return dict(zip(members, coords))
+
+    def expand(self, cid, pos):
+        self.expanded[cid] = pos
+
+    def collapse(self, cid):
+        self.expanded.pop(cid, None)
+
+    def node_for(self, n):
+        cid = self.community[n]
+        return n if cid in self.expanded else self.supernodes[cid]
+
+    def display(self):
+        D = nx.Graph()
+        pos = {}
+        for cid, supernode in enumerate(self.supernodes):
+            if cid in self.expanded:
+                for n, p in self.expanded[cid].items():
+                    D.add_node(n, **self.graph.nodes[n])
+                    pos[n] = p
+            else:
+                D.add_node(supernode, type=self.types[cid], members=supernode.size)
+                pos[supernode] = self.coarse_pos[cid]
+        for a, b in self.coarse.edges():
+            if a not in self.expanded and b not in self.expanded:
+                D.add_edge(self.supernodes[a], self.supernodes[b])
+        for cid in self.expanded:
+            for n in self.members[cid]:
+                for nbr in self.graph.adj[n]:
+                    other = self.node_for(nbr)
+                    if other != n:
+                        D.add_edge(n, other)
+        return D, pos
+
+
+@profiled("analyse")
+def compute_overview(G, layout_func, job):
+    communities = detect_communities(G, job)
+    job.report()
+    return CommunityView(G, communities, layout_func)
+
+
+def compute_community_layout(view, cid, sub, job):
+    return view.layout_members(cid, sub, job)
+
+
+class SearchIndex:
+    # Node values (and optionally a few attributes) are lowercased and joined
+    # into one newline separated text per column; a query is a single regex
+    # scan over that text and match offsets are mapped back to nodes with a
+    # binary search. Edits made after the columns were built go to a small
+    # pending table and a tombstone set until there are enough of them to
+    # rebuild from the graph.
+    ATTRIBUTES = ("type", "url", "description")
+
+    def __init__(self, G=None):
+        self.rebuild(G if G is not None else VersionedGraph())
+
+    def rebuild(self, G):
+        self.graph = G
+        self.dirty = True
+
+    def add(self, node, data=None):
+        if self.dirty:
+            return
+        self.removed.add(node)
+        self.pending[node] = self._record(node, data or {})
+        self._check_compaction()
+
+    def remove(self, node):
+        if self.dirty:
+            return
+        self.pending.pop(node, None)
+        self.removed.add(node)
+        self._check_compaction()
+
+    def _check_compaction(self):
+        if len(self.pending) + len(self.removed) > max(1000, len(self.order) // 20):
+            self.dirty = True
+
+    def _record(self, node, data):
+        attrs = " ".join(str(data.get(k) or "") for k in self.ATTRIBUTES)
+        return str(node).lower().replace("\n", " "), attrs.lower().replace("\n", " ")
+
+    @profiled("recherche", "SearchIndex.build")
+    def _build(self):
+        self.order = list(self.graph.nodes)
+        records = [self._record(n, d) for n, d in self.graph.nodes(data=True)]
+        self.values = self._join([r[0] for r in records])
+        self.attrs = self._join([r[1] for r in records])
+        self.pending = {}
+        self.removed = set()
+        self.dirty = False
+
+    @staticmethod
+    def _join(texts):
+        lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=len(texts))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        return "\n".join(texts) + "\n", offsets
+
+    @staticmethod
+    def _find(column, pattern):
+        text, offsets = column
+        # The trailing [^\n]* consumes the rest of the record so each
+        # record yields at most one match.
+        starts = np.fromiter((m.start() for m in pattern.finditer(text)), dtype=np.int64)
+        return np.searchsorted(offsets, starts, side="right") - 1
+
+    @profiled("recherche", "SearchIndex.search")
+    def search(self, text, attributes=False):
+        text = text.lower()
+        if not text:
+            return []
+        if self.dirty:
+            self._build()
+        pattern = re.compile(re.escape(text) + "[^\n]*")
+        hits = self._find(self.values, pattern)
+        if attributes:
+            hits = np.union1d(hits, self._find(self.attrs, pattern))
+        matches = [self.order[i] for i in hits]
+        if self.removed:
+            matches = [n for n in matches if n not in self.removed]
+        matches.extend(
+            n for n, (value, attrs) in self.pending.items()
+            if text in value or (attributes and text in attrs)
+        )
+        return matches
+
+
+LAYOUTS = {
+    "Spring": nx.spring_layout,
+    "Multiniveau": multilevel_layout,
+    "Circular": nx.circular_layout,
+    "Shell": nx.shell_layout,
+    "Spectral": nx.spectral_layout,
+    "Random": nx.random_layout
+}
+
+# Force-directed layouts: they take an iteration budget and can be refined
+# incrementally after an edit.
+FORCE_LAYOUTS = (nx.spring_layout, multilevel_layout)
+
+TYPE_COLORS = {
+    "email": "#E91E63",
+    "ip": "#3F51B5",
+    "nom": "#4CAF50",
+    "autre": "#9E9E9E"
+}
+DEFAULT_COLOR = "#9E9E9E"
+
+
+@profiled("io")
+def read_json_graph(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        G = nx.node_link_graph(json.load(f))
+    # Older saves repeat each node's name as "value" and keep empty fields.
+    for n, d in G.nodes(data=True):
+        for key in [k for k, v in d.items() if v == "" or (k == "value" and v == n)]:
+            del d[key]
+    return VersionedGraph(G)
+
+
+@profiled("io")
+def write_json_graph(G, path):
+    data = nx.node_link_data(G)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+@profiled("io")
+def render_png(path, G, pos, measure=None, size=(16, 10), dpi=100):
+    # Off-screen version of the canvas drawing. matplotlib is only imported
+    # here, through the Agg backend, so the batch mode never needs a display.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+
+    nodes = list(G.nodes)
+    index = {n: i for i, n in enumerate(nodes)}
+    coords = np.array([pos[n] for n in nodes], dtype=float).reshape(-1, 2)
+    edges = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=int).reshape(-1, 2)
+    colors = type_colors(G, nodes)
+    sizes = np.full(len(nodes), 800.0)
+    if measure:
+        values = np.fromiter((measure.get(n, 0) for n in nodes), dtype=float, count=len(nodes))
+        norm = (values - values.min()) / ((values.max() - values.min()) or 1)
+        sizes = 300 + 3000 * norm
+        colors = colors + (1.0 - colors) * norm[:, None]
+    lod = min(1.0, math.sqrt(150 / max(len(nodes), 1)))
+
+    fig = Figure(figsize=size, dpi=dpi)
+    FigureCanvasAgg(fig)
+    fig.patch.set_facecolor("#1e1e1e")
+    ax = fig.add_subplot()
+    ax.set_facecolor("#1e1e1e")
+    ax.axis('off')
+    ax.add_collection(LineCollection(coords[edges], colors="#888", alpha=0.7, zorder=1))
+    ax.scatter(
+        coords[:, 0], coords[:, 1], s=sizes * lod, c=colors, edgecolors='white',
+        linewidths=1.5 * lod if lod > 0.5 else 0, zorder=2
+    )
+    if len(nodes) <= 150:
+        for n, (x, y) in zip(nodes, coords):
+            ax.text(x, y, str(n), color='white', fontsize=11, fontweight='bold', ha='center', va='center', zorder=3)
+    ax.autoscale_view()
+    fig.tight_layout()
+    fig.savefig(path, facecolor=fig.get_facecolor())
+
+
+MEASURES = {
+    "degree": "Degré",
+    "clustering": "Coefficient de clustering",
+    "pagerank": "PageRank",
+    "betweenness": "Intermédiarité",
+    "closeness": "Proximité"
+}
+
+
+def compute_measure(G, name, pivots=0, processes=1):
+    job = Job(name, MEASURES[name], None)
+    matrix = GraphMatrix(G)
+    if name == "degree":
+        return matrix.degree()
+    if name == "clustering":
+        return compute_clustering(matrix, job)
+    if name == "pagerank":
+        return compute_pagerank(matrix, None, job)
+    if name == "betweenness":
+        return compute_betweenness(matrix, pivots, 0, processes, job)
+    return compute_closeness(matrix, pivots, 0, processes, job)
+
+
+def run_batch(inputs, outputs, layout="spring", measures=(), pivots=0, processes=1, log=print, iterations=None):
+    # Headless pipeline: load and merge the inputs, compute the measures,
+    # lay the graph out when an output needs positions, then write every
+    # output in the format given by its extension.
+    job = Job("batch", "Traitement", None)
+    G = VersionedGraph()
+    pos = {}
+
+    def step(title, func, *args):
+        start = time.perf_counter()
+        with profiler.span(title, "batch"):
+            result = func(*args)
+        log(f"{title} : {time.perf_counter() - start:.2f} s")
+        return result
+
+    for path in inputs:
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".csv":
+            step(f"Import {path}", read_csv_graph, path, G, job)
+        elif ext == ".json":
+            G.update(step(f"Import {path}", read_json_graph, path))
+        elif ext == ".cxs":
+            loaded, loaded_pos, _, _ = step(f"Import {path}", read_project, path, job)
+            G.update(loaded)
+            pos.update(loaded_pos)
+        else:
+            raise ValueError(f"Format d'entrée non reconnu : {path}")
+    log(f"{G.number_of_nodes()} nœuds, {G.number_of_edges()} arêtes")
+
+    measure = measure_name = None
+    for name in measures:
+        measure = step(MEASURES[name], compute_measure, G, name, pivots, processes)
+        measure_name = MEASURES[name]
+        nx.set_node_attributes(G, measure, name)
+
+    if any(os.path.splitext(path)[1].lower() in (".png", ".cxs") for path in outputs):
+        if layout == "keep":
+            pos = step("Disposition", incremental_layout, G, pos)
+        else:
+            layout_func = next(func for key, func in LAYOUTS.items() if key.lower() == layout)
+            pos = step("Disposition", compute_layout, G, layout_func, iterations, job)
+
+    layout_key = next((key for key in LAYOUTS if key.lower() == layout), None)
+    for path in outputs:
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".csv":
+            step(f"Export {path}", write_csv_graph, G, path, job)
+        elif ext == ".json":
+            step(f"Export {path}", write_json_graph, G, path)
+        elif ext == ".png":
+            step(f"Export {path}", render_png, path, G, pos, measure)
+        elif ext == ".cxs":
+            step(f"Export {path}", write_project, path, G, pos, measure, measure_name, layout_key, job)
+        else:
+            raise ValueError(f"Format de sortie non reconnu : {path}")
+    return G, pos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="cxs_core.py",
+        description="Traitement sans interface d'un graphe OSINT CXS : import, mesures, disposition, export."
+    )
+    parser.add_argument("inputs", nargs="+", help="fichiers .csv, .json ou .cxs à fusionner")
+    parser.add_argument(
+        "-o", "--output", action="append", default=[], required=True,
+        help="fichier de sortie .csv, .json, .png ou .cxs (répétable)"
+    )
+    parser.add_argument(
+        "-m", "--measure", action="append", default=[], choices=list(MEASURES),
+        help="mesure à calculer (répétable) ; la dernière dimensionne les nœuds du PNG"
+    )
+    parser.add_argument(
+        "-l", "--layout", default="spring", choices=[key.lower() for key in LAYOUTS] + ["keep"],
+        help="disposition ; keep conserve les positions d'un projet .cxs"
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=None,
+        help="itérations des dispositions spring et multiniveau (par niveau pour multiniveau)"
+    )
+    parser.add_argument("--pivots", type=int, default=0, help="pivots échantillonnés pour les centralités (0 = exact)")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="processus pour les centralités")
+    parser.add_argument("--trace", help="trace Chrome (chrome://tracing) des étapes du traitement")
+    parser.add_argument("-q", "--quiet", action="store_true", help="ne pas afficher les étapes")
+    args = parser.parse_args(argv)
+
+    log = (lambda message: None) if args.quiet else (lambda message: print(message, file=sys.stderr))
+    profiler.enabled = bool(args.trace)
+    try:
+        run_batch(args.inputs, args.output, args.layout, args.measure, args.pivots, args.processes, log, args.iterations)
+    except (OSError, ValueError, nx.NetworkXException) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.trace:
+            profiler.write_chrome_trace(args.trace)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())